@@ -1,20 +1,269 @@
 """
 FastAPI application for universal website scraper.
 """
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any, Awaitable, Dict, List, Literal, Optional, Tuple, TypeVar
+import asyncio
+import json
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 
-from scraper import scrape_url
+from browser_pool import BrowserPool
+from cache import CacheDirectives, ResultCache
+from config import Settings
+from crawler import Crawler
+from deadline import Deadline
+from dedup import NearDuplicateTracker
+from http_client import create_http_client
+from jobs import Job, JobQueue, QueueFullError
+from noise_filter import NoiseFilter
+from parse_pool import ParsePool
+from politeness import PolitenessScheduler, RobotsCache
+from retry import RetryPolicy
+from revalidation import RevalidationStore
+from scheduler import ScrapeScheduler
+from scraper import RAW_HTML_BUDGET, ScrapeOptions, scrape_url, scrape_url_stream
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the shared scraping resources for the lifetime of the app."""
+    settings = Settings.from_env()
+    browser_pool = BrowserPool(
+        size=settings.browser_pool_size,
+        max_pages=settings.browser_max_pages,
+        max_memory_mb=settings.browser_max_memory_mb,
+    )
+    await browser_pool.start()
+    http_client = create_http_client(settings)
+    app.state.settings = settings
+    app.state.browser_pool = browser_pool
+    app.state.http_client = http_client
+    app.state.scheduler = ScrapeScheduler(
+        max_concurrency=settings.scheduler_max_concurrency,
+        max_per_host=settings.scheduler_max_per_host,
+    )
+    app.state.politeness = None
+    if settings.politeness_enabled:
+        app.state.politeness = PolitenessScheduler(
+            rate=settings.politeness_rate,
+            burst=settings.politeness_burst,
+            max_per_host=settings.politeness_max_per_host,
+            robots=RobotsCache(http_client, ttl=settings.robots_ttl) if settings.robots_enabled else None,
+            obey_robots=settings.robots_obey_disallow,
+            max_retry_after=settings.politeness_max_retry_after,
+        )
+    app.state.retry_policy = RetryPolicy(
+        max_attempts=settings.retry_max_attempts,
+        base_delay=settings.retry_base_delay,
+        max_delay=settings.retry_max_delay,
+        deadline=settings.retry_deadline,
+    )
+    app.state.revalidation_store = RevalidationStore(max_entries=settings.revalidation_max_entries)
+    app.state.noise_filter = (
+        NoiseFilter.from_file(settings.noise_rules_path) if settings.noise_rules_path else NoiseFilter()
+    )
+    app.state.parse_pool = None
+    if settings.parse_pool_enabled:
+        app.state.parse_pool = ParsePool(
+            workers=settings.parse_pool_workers,
+            noise_filter=app.state.noise_filter,
+        )
+    app.state.cache = None
+    if settings.cache_enabled:
+        app.state.cache = ResultCache(
+            ttl=settings.cache_ttl,
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            disk_path=settings.cache_disk_path or None,
+            error_ttl=settings.cache_error_ttl,
+        )
+    app.state.jobs = JobQueue(
+        _run_job,
+        workers=settings.jobs_workers,
+        max_queue=settings.jobs_max_queue,
+        retention=settings.jobs_retention,
+        db_path=settings.jobs_db_path or None,
+    )
+    await app.state.jobs.start()
+    try:
+        yield
+    finally:
+        await app.state.jobs.close()
+        if app.state.parse_pool is not None:
+            app.state.parse_pool.close()
+        if app.state.cache is not None:
+            app.state.cache.close()
+        await http_client.aclose()
+        await browser_pool.close()
 
-app = FastAPI(title="Universal Website Scraper")
+
+app = FastAPI(title="Universal Website Scraper", lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
 
 
-class ScrapeRequest(BaseModel):
+class ScrapeOptionsModel(BaseModel):
+    mode: Literal["static", "auto", "interactive"] = "auto"
+    wait_for: Optional[str] = None
+    # Browser sub-resource blocking overrides; omit for defaults, [] to disable
+    block_resource_types: Optional[List[str]] = None
+    block_domains: Optional[List[str]] = None
+    allow_domains: Optional[List[str]] = None
+    # Give each node's content only to its innermost landmark section
+    dedupe_landmarks: bool = False
+    # rawHtml: disable, restrict to some section ids, or change its size budget
+    include_raw_html: bool = True
+    raw_html_sections: Optional[List[str]] = None
+    raw_html_budget: int = Field(RAW_HTML_BUDGET, ge=0)
+    # Flag or drop sections that nearly repeat another (within the page, and
+    # across pages in batches and crawls)
+    near_duplicates: Optional[Literal["flag", "skip"]] = None
+    # Click tabs concurrently, each in its own page of the browser context
+    parallel_tabs: bool = False
+    # Cache-Control style directives: no-cache (refresh), no-store (bypass), max-age=N
+    cache_control: Optional[str] = None
+
+    def to_options(self) -> ScrapeOptions:
+        """Scraper options carried by this request."""
+        return ScrapeOptions(
+            mode=self.mode,
+            wait_for=self.wait_for,
+            block_resource_types=self.block_resource_types,
+            block_domains=self.block_domains,
+            allow_domains=self.allow_domains,
+            dedupe_landmarks=self.dedupe_landmarks,
+            include_raw_html=self.include_raw_html,
+            raw_html_sections=self.raw_html_sections,
+            raw_html_budget=self.raw_html_budget,
+            near_duplicates=self.near_duplicates,
+            parallel_tabs=self.parallel_tabs,
+        )
+
+
+class ScrapeRequest(ScrapeOptionsModel):
     url: str
+    # Stream meta, each section, interactions and errors as they are produced
+    stream: Optional[Literal["ndjson", "sse"]] = None
+    # Total seconds shared by fetch, render, interactions and parse
+    deadline: Optional[float] = Field(None, gt=0)
+
+
+class JobRequest(ScrapeOptionsModel):
+    url: str
+
+
+class CrawlRequest(ScrapeOptionsModel):
+    url: str
+    max_depth: int = Field(2, ge=0)
+    max_pages: int = Field(50, ge=1)
+    concurrency: int = Field(4, ge=1)
+    # Also follow links to subdomains of the seed host and of allowed_hosts
+    allow_subdomains: bool = False
+    allowed_hosts: Optional[List[str]] = None
+    stream: Literal["ndjson", "sse"] = "ndjson"
+
+
+class BatchScrapeRequest(ScrapeOptionsModel):
+    urls: List[str]
+    concurrency: int = Field(5, ge=1)
+    stream: bool = False
+
+
+def _validate_url(url: str):
+    """Reject anything that is not an http(s) URL."""
+    if not url.startswith(("http://", "https://")):
+        raise HTTPException(
+            status_code=400,
+            detail="Only http:// and https:// URLs are supported"
+        )
+
+
+# How often a pending non-streaming request checks whether its client left
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before its response was ready."""
+
+
+def _deadline(seconds: Optional[float] = None) -> Deadline:
+    """Request deadline, falling back to SCRAPER_DEFAULT_DEADLINE (0 = none)."""
+    return Deadline(seconds or app.state.settings.default_deadline or None)
+
+
+async def _until_disconnected(http_request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await awaitable, cancelling it as soon as the client disconnects so its
+    browser pages and scheduler slots are released right away.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def _encode_event(event: Dict[str, Any], fmt: str) -> str:
+    """Serialize one streamed object as an NDJSON line or an SSE message."""
+    data = json.dumps(event)
+    if fmt == "sse":
+        return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _scrape(url: str, options: ScrapeOptions,
+                  directives: Optional[CacheDirectives] = None,
+                  deadline: Optional[Deadline] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    Scrape one URL using the app's shared browser pool and HTTP client,
+    going through the result cache. Returns the result and whether it was cached.
+    Results cut short by the deadline are not cached.
+    """
+    cache = app.state.cache
+    if cache is not None:
+        cached = await cache.get(url, options, directives)
+        if cached is not None:
+            return cached, True
+    result = await scrape_url(
+        url,
+        options,
+        browser_pool=app.state.browser_pool,
+        http_client=app.state.http_client,
+        revalidation_store=app.state.revalidation_store,
+        noise_filter=app.state.noise_filter,
+        max_response_bytes=app.state.settings.static_max_bytes,
+        parse_pool=app.state.parse_pool,
+        politeness=app.state.politeness,
+        retry_policy=app.state.retry_policy,
+        deadline=deadline,
+    )
+    if cache is not None and (deadline is None or deadline.exceeded_in is None):
+        await cache.set(url, options, result, directives)
+    return result, False
+
+
+async def _run_job(job: Job) -> Tuple[Dict[str, Any], bool]:
+    """Run a background job through the shared scheduler and result cache."""
+    options = job.scrape_options()
+    directives = CacheDirectives.parse(job.cache_control)
+    return await app.state.scheduler.run(job.url, lambda: _scrape(job.url, options, directives, _deadline()))
 
 
 @app.get("/healthz")
@@ -23,23 +272,239 @@ async def healthz():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+async def stats():
+    """Runtime statistics for the shared scraping resources."""
+    return {
+        "browserPool": app.state.browser_pool.stats(),
+        "scheduler": app.state.scheduler.stats(),
+        "politeness": app.state.politeness.stats() if app.state.politeness is not None else None,
+        "retry": app.state.retry_policy.stats(),
+        "cache": app.state.cache.stats() if app.state.cache is not None else None,
+        "revalidation": app.state.revalidation_store.stats(),
+        "noiseFilter": app.state.noise_filter.stats(),
+        "jobs": app.state.jobs.stats(),
+        "parsePool": app.state.parse_pool.stats() if app.state.parse_pool is not None else None,
+    }
+
+
 @app.post("/scrape")
-async def scrape(request: ScrapeRequest):
-    """Scrape a URL and return structured JSON."""
+async def scrape(request: ScrapeRequest, http_request: Request,
+                 cache_control: Optional[str] = Header(None, alias="Cache-Control")):
+    """
+    Scrape a URL and return structured JSON. The deadline starts when the
+    request arrives; a client disconnect cancels the scrape.
+    """
+    deadline = _deadline(request.deadline)
     try:
         # Validate URL scheme
-        if not request.url.startswith(("http://", "https://")):
-            raise HTTPException(
-                status_code=400,
-                detail="Only http:// and https:// URLs are supported"
-            )
+        _validate_url(request.url)
         
-        result = await scrape_url(request.url)
-        return {"result": result}
+        directives = CacheDirectives.parse(request.cache_control or cache_control)
+        if request.stream:
+            return await _stream_scrape(request.url, request.to_options(), request.stream, directives,
+                                        deadline)
+        
+        result, cached = await _until_disconnected(
+            http_request, _scrape(request.url, request.to_options(), directives, deadline)
+        )
+        return {"result": result, "cached": cached}
+    except ClientDisconnected:
+        # Nobody is listening; 499 only shows up in access logs
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _stream_scrape(url: str, options: ScrapeOptions, fmt: str,
+                         directives: CacheDirectives, deadline: Deadline) -> StreamingResponse:
+    """
+    Stream one scrape as meta, section, interactions and errors events.
+    Cached results are replayed; live streams are not stored, since that
+    would mean holding the whole result in memory. Starlette cancels the
+    generator when the client disconnects, which closes the browser page.
+    """
+    cache = app.state.cache
+    cached = await cache.get(url, options, directives) if cache is not None else None
+    if cached is not None:
+        async def replay():
+            # Same events and fields as Scraper.scrape_stream(), plus cached
+            yield _encode_event({"type": "meta", "url": cached["url"], "scrapedAt": cached["scrapedAt"],
+                                 "meta": cached["meta"], "revalidated": cached.get("revalidated", False),
+                                 "cached": True}, fmt)
+            for section in cached["sections"]:
+                yield _encode_event({"type": "section", "section": section}, fmt)
+            yield _encode_event({"type": "interactions", "interactions": cached["interactions"],
+                                 "resources": cached.get("resources", {}),
+                                 "parseStats": cached.get("parseStats", {})}, fmt)
+            yield _encode_event({"type": "errors", "errors": cached["errors"]}, fmt)
+
+        return StreamingResponse(replay(), media_type=STREAM_MEDIA_TYPES[fmt])
+
+    async def events():
+        try:
+            async for event in scrape_url_stream(
+                url,
+                options,
+                browser_pool=app.state.browser_pool,
+                http_client=app.state.http_client,
+                revalidation_store=app.state.revalidation_store,
+                noise_filter=app.state.noise_filter,
+                max_response_bytes=app.state.settings.static_max_bytes,
+                parse_pool=app.state.parse_pool,
+                politeness=app.state.politeness,
+                retry_policy=app.state.retry_policy,
+                deadline=deadline,
+            ):
+                yield _encode_event(event, fmt)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield _encode_event(
+                {"type": "errors", "errors": [{"message": str(e), "phase": "fetch"}]}, fmt
+            )
+
+    return StreamingResponse(events(), media_type=STREAM_MEDIA_TYPES[fmt])
+
+
+@app.post("/scrape/batch")
+async def scrape_batch(request: BatchScrapeRequest, http_request: Request):
+    """
+    Scrape many URLs through the shared scheduler. Results are returned in
+    request order, or streamed as NDJSON in completion order when stream=true.
+    Each URL gets the default deadline from when its scrape starts; a client
+    disconnect cancels the remaining work.
+    """
+    settings = app.state.settings
+    if not request.urls:
+        raise HTTPException(status_code=400, detail="urls must not be empty")
+    if len(request.urls) > settings.batch_max_urls:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_max_urls} URLs are allowed per batch"
+        )
+    for url in request.urls:
+        _validate_url(url)
+
+    options = request.to_options()
+    directives = CacheDirectives.parse(request.cache_control)
+    scheduler = app.state.scheduler
+    batch_limit = asyncio.Semaphore(request.concurrency)
+    duplicates = NearDuplicateTracker(request.near_duplicates) if request.near_duplicates else None
+
+    async def run_one(index: int, url: str) -> Dict[str, Any]:
+        async with batch_limit:
+            try:
+                result, cached = await scheduler.run(
+                    url, lambda: _scrape(url, options, directives, _deadline())
+                )
+            except Exception as e:
+                return {"index": index, "url": url, "error": str(e)}
+            if duplicates is not None:
+                # Pages that finish first are the originals
+                result, duplicate_of = duplicates.check(url, result)
+                if duplicate_of is not None:
+                    if duplicates.mode == "skip":
+                        return {"index": index, "url": url, "nearDuplicateOf": duplicate_of, "cached": cached}
+                    return {"index": index, "url": url, "result": result, "cached": cached,
+                            "nearDuplicateOf": duplicate_of}
+            return {"index": index, "url": url, "result": result, "cached": cached}
+
+    if not request.stream:
+        try:
+            results = await _until_disconnected(http_request, asyncio.gather(
+                *(run_one(index, url) for index, url in enumerate(request.urls))
+            ))
+        except ClientDisconnected:
+            return Response(status_code=499)
+        return {"results": results}
+
+    async def stream_results():
+        tasks = [asyncio.create_task(run_one(index, url)) for index, url in enumerate(request.urls)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield _encode_event(await finished, "ndjson")
+        finally:
+            # Client went away or the stream ended early: stop outstanding work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post("/crawl")
+async def crawl(request: CrawlRequest):
+    """
+    Crawl the seed's site, scraping each page like /scrape through the shared
+    scheduler and cache. Page events are streamed as each page finishes,
+    followed by a summary; a client disconnect stops the crawl.
+    """
+    settings = app.state.settings
+    _validate_url(request.url)
+    if request.max_pages > settings.crawl_max_pages:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.crawl_max_pages} pages are allowed per crawl"
+        )
+    if request.max_depth > settings.crawl_max_depth:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_depth may be at most {settings.crawl_max_depth}"
+        )
+
+    # Follow every link in the page, not only those kept in its sections
+    options = replace(request.to_options(), collect_links=True)
+    directives = CacheDirectives.parse(request.cache_control)
+    scheduler = app.state.scheduler
+
+    async def fetch(url: str) -> Tuple[Dict[str, Any], bool]:
+        return await scheduler.run(url, lambda: _scrape(url, options, directives, _deadline()))
+
+    crawler = Crawler(
+        fetch,
+        near_duplicates=NearDuplicateTracker(request.near_duplicates) if request.near_duplicates else None,
+        max_depth=request.max_depth,
+        max_pages=request.max_pages,
+        concurrency=request.concurrency,
+        allow_subdomains=request.allow_subdomains,
+        allowed_domains=request.allowed_hosts,
+    )
+
+    async def events():
+        async for event in crawler.crawl(request.url):
+            yield _encode_event(event, request.stream)
+
+    return StreamingResponse(events(), media_type=STREAM_MEDIA_TYPES[request.stream])
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """Queue a scrape and return its job id immediately."""
+    _validate_url(request.url)
+    try:
+        job = await app.state.jobs.submit(request.url, request.to_options(), request.cache_control)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job, with its result once it has finished."""
+    job = await app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await app.state.jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Serve the frontend UI."""
@@ -0,0 +1,132 @@
+"""
+Benchmark: single-pass SectionWalker against the previous per-field css()
+queries in _extract_section(), over a corpus of saved pages.
+
+Every section is extracted both ways and the outputs are compared, so the
+run fails loudly if the walker ever diverges from the reference. Without
+arguments it runs over benchmarks/corpus/, a few hand-written pages shaped
+like a blog post, a product listing and a docs page, plus the synthetic page
+from bench_parse.py. Pass saved pages of your own for numbers that matter.
+
+Usage:
+    python benchmarks/bench_extract.py [corpus_dir_or_page.html ...]
+"""
+import glob
+import os
+import re
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scraper import ParsedDocument, ScrapeOptions, Scraper
+from section_walker import walk_section
+from bench_parse import synthetic_page
+
+URL = "https://example.com/"
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+LANDMARKS = "header, nav, main, section, footer, article"
+
+
+def reference_content(elem):
+    """The css()-based extraction _extract_section() used before the walker."""
+    label = None
+    for h in elem.css("h1, h2, h3"):
+        text = h.text().strip()
+        if text:
+            label = text[:50]
+            break
+    if label is None:
+        words = elem.text().strip().split()[:7]
+        label = " ".join(words)[:50] if words else elem.tag.lower().capitalize()
+
+    headings = [h.text().strip() for h in elem.css("h1, h2, h3, h4, h5, h6") if h.text().strip()]
+    text = re.sub(r'\s+', ' ', elem.text().strip())
+    links = []
+    for link in elem.css("a"):
+        href = link.attributes.get("href", "")
+        if href:
+            links.append({"text": link.text().strip(), "href": urljoin(URL, href)})
+    images = []
+    for img in elem.css("img"):
+        src = img.attributes.get("src", "")
+        if src:
+            images.append({"src": urljoin(URL, src), "alt": img.attributes.get("alt", "")})
+    lists = []
+    for ul_ol in elem.css("ul, ol"):
+        items = [li.text().strip() for li in ul_ol.css("li") if li.text().strip()]
+        if items:
+            lists.append(items)
+    tables = []
+    for table in elem.css("table"):
+        rows = []
+        for row in table.css("tr"):
+            cells = [cell.text().strip() for cell in row.css("td, th")]
+            if cells:
+                rows.append(cells)
+        if rows:
+            tables.append(rows)
+    return label, {
+        "headings": headings[:10],
+        "text": text[:5000],
+        "links": links[:50],
+        "images": images[:20],
+        "lists": lists[:10],
+        "tables": tables,
+    }
+
+
+def load_corpus(args):
+    paths = []
+    for arg in args or [CORPUS_DIR]:
+        paths.extend(sorted(glob.glob(os.path.join(arg, "*.htm*"))) if os.path.isdir(arg) else [arg])
+    pages = [open(path, encoding="utf-8", errors="replace").read() for path in paths]
+    return pages if args else pages + [synthetic_page()]
+
+
+def landmarks(html):
+    return ParsedDocument(html).tree.css(LANDMARKS)
+
+
+def main():
+    pages = load_corpus(sys.argv[1:])
+    scraper = Scraper()
+    repeat = 5
+
+    elements = [elem for html in pages for elem in landmarks(html)]
+    for idx, elem in enumerate(elements):
+        section = scraper._extract_section(elem, URL, idx)
+        label, content = reference_content(elem)
+        if section["label"] != label or section["content"] != content:
+            raise SystemExit(f"Mismatch in section {idx} ({elem.tag})")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for elem in elements:
+            reference_content(elem)
+    reference = time.perf_counter() - start
+
+    # The queries the walker replaced: one walk plus the label
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for elem in elements:
+            scraper._derive_label(elem, walk_section(elem))
+    walker = time.perf_counter() - start
+
+    # The whole section, which adds type detection, whitespace cleanup and
+    # URL resolution on top of the walk (rawHtml is left out of both)
+    no_raw_html = ScrapeOptions(include_raw_html=False)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for idx, elem in enumerate(elements):
+            scraper._extract_section(elem, URL, idx, options=no_raw_html)
+    extract = time.perf_counter() - start
+
+    print(f"{len(pages)} page(s), {len(elements)} sections, outputs identical")
+    print(f"css() queries       {reference * 1000:.1f}ms")
+    print(f"single pass         {walker * 1000:.1f}ms  ({reference / walker:.2f}x)")
+    print(f"_extract_section()  {extract * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark: parse calls and wall time for the static pipeline.
+
+Compares building a fresh tree for every step (the old behaviour) against
+sharing one ParsedDocument across heuristic, meta and section extraction.
+
+Usage:
+    python benchmarks/bench_parse.py [page.html ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import scraper as scraper_module
+from scraper import ParsedDocument, Scraper
+
+URL = "https://example.com/"
+
+
+def synthetic_page(sections: int = 200) -> str:
+    """A large page with nested landmarks, lists, tables and links."""
+    parts = ["<html lang='en'><head><title>Bench</title>",
+             "<meta name='description' content='benchmark page'></head><body>",
+             "<header><nav><a href='/'>Home</a><a href='/about'>About</a></nav></header><main>"]
+    for i in range(sections):
+        parts.append(
+            f"<section class='block-{i}'><h2>Section {i}</h2>"
+            f"<p>{'Lorem ipsum dolor sit amet. ' * 20}</p>"
+            f"<ul>{''.join(f'<li>Item {j}</li>' for j in range(10))}</ul>"
+            f"<table><tr><th>a</th><th>b</th></tr><tr><td>{i}</td><td>{i * 2}</td></tr></table>"
+            f"<a href='/page/{i}'>More</a><img src='/img/{i}.png' alt='img {i}'>"
+            f"<div class='cookie-notice'>We use cookies</div></section>"
+        )
+    parts.append("</main><footer>Footer text</footer></body></html>")
+    return "".join(parts)
+
+
+class CountingParser(scraper_module.HTMLParser):
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingParser.calls += 1
+        super().__init__(*args, **kwargs)
+
+
+def per_step_parse(scraper: Scraper, html: str):
+    """Old pipeline: every step parsed its own copy of the HTML."""
+    scraper._extract_meta_static(ParsedDocument(html))
+    ParsedDocument(html).body_text
+    scraper._has_main_content(ParsedDocument(html))
+    scraper._parse_sections(ParsedDocument(html), URL)
+
+
+def single_parse(scraper: Scraper, html: str):
+    """New pipeline: one tree shared by every step."""
+    doc = ParsedDocument(html)
+    scraper._extract_meta_static(doc)
+    doc.body_text
+    scraper._has_main_content(doc)
+    scraper._parse_sections(doc, URL)
+
+
+def run(name: str, fn, scraper: Scraper, pages, repeat: int):
+    CountingParser.calls = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            fn(scraper, html)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} parses={CountingParser.calls:<6} wall={elapsed * 1000:.1f}ms")
+
+
+def main():
+    pages = [open(path, encoding="utf-8", errors="replace").read() for path in sys.argv[1:]]
+    if not pages:
+        pages = [synthetic_page()]
+    scraper_module.HTMLParser = CountingParser
+    scraper = Scraper()
+    repeat = 20
+    print(f"{len(pages)} page(s), {sum(len(p) for p in pages)} bytes, {repeat} iterations")
+    run("per-step parse", per_step_parse, scraper, pages, repeat)
+    run("single parse", single_parse, scraper, pages, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: HTML -> sections throughput of the parse process pool as the
+number of worker processes grows, against parsing in the calling process.
+
+Each configuration parses the same set of pages through
+parse_sections_worker(), the function the ParsePool runs, and reports pages
+per second and the speedup over one in-process parser.
+
+Usage:
+    python benchmarks/bench_parse_pool.py [--pages N] [page.html ...]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from noise_filter import DEFAULT_DENY_RULES
+from parse_pool import _init_worker, parse_sections_worker
+from scraper import ScrapeOptions
+from bench_parse import synthetic_page
+
+URL = "https://example.com/"
+
+
+def worker_counts(cores: int):
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def in_process(payloads, options) -> float:
+    _init_worker(DEFAULT_DENY_RULES, ())
+    start = time.perf_counter()
+    for payload in payloads:
+        parse_sections_worker(payload, URL, options)
+    return time.perf_counter() - start
+
+
+def pooled(payloads, options, workers: int) -> float:
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(DEFAULT_DENY_RULES, ())) as executor:
+        # Warm up every worker so process start-up is not measured
+        list(executor.map(parse_sections_worker, payloads[:workers], [URL] * workers, [options] * workers))
+        start = time.perf_counter()
+        list(executor.map(parse_sections_worker, payloads, [URL] * len(payloads), [options] * len(payloads)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=64, help="pages parsed per configuration")
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    sources = [open(path, encoding="utf-8", errors="replace").read() for path in args.files]
+    sources = sources or [synthetic_page()]
+    payloads = [sources[i % len(sources)].encode("utf-8") for i in range(args.pages)]
+    options = asdict(ScrapeOptions())
+    cores = os.cpu_count() or 1
+
+    print(f"{len(payloads)} pages, {sum(map(len, payloads))} bytes, {cores} cores")
+    baseline = in_process(payloads, options)
+    print(f"in-process     {len(payloads) / baseline:8.1f} pages/s")
+    for workers in worker_counts(cores):
+        elapsed = pooled(payloads, options, workers)
+        print(f"{workers:>2} worker(s)   {len(payloads) / elapsed:8.1f} pages/s  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Process-wide pool of warm Chromium browsers shared across scrape requests.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+import asyncio
+import logging
+import os
+
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is disabled without psutil
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledBrowser:
+    """A single Chromium instance and its usage counters."""
+
+    def __init__(self, browser: Browser, pids: Set[int]):
+        self.browser = browser
+        self.pids = pids
+        self.pages_served = 0
+        self.active_contexts = 0
+        self.retiring = False
+        self.crashed = False
+
+    def memory_mb(self) -> Optional[float]:
+        """Resident memory of the browser process tree, if measurable."""
+        if psutil is None or not self.pids:
+            return None
+        total = 0
+        for pid in self.pids:
+            try:
+                proc = psutil.Process(pid)
+                total += proc.memory_info().rss
+                for child in proc.children(recursive=True):
+                    try:
+                        total += child.memory_info().rss
+                    except psutil.Error:
+                        pass
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Holds N warm Chromium browsers and hands out an isolated BrowserContext
+    per request. Browsers are recycled after a number of pages or once their
+    memory grows past a limit, and crashed browsers are replaced.
+    """
+
+    def __init__(self, size: int = 2, max_pages: int = 100, max_memory_mb: int = 1024,
+                 launch_options: Optional[Dict[str, Any]] = None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.launch_options = launch_options or {"headless": True}
+        self.playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._closing = False
+        self._tasks: Set[asyncio.Task] = set()
+        self.launched = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    async def start(self):
+        """Start Playwright and launch the warm browsers."""
+        if self.max_memory_mb and psutil is None:
+            logger.warning("psutil is not installed; browsers will not be recycled on memory "
+                           "(max_memory_mb=%d is ignored)", self.max_memory_mb)
+        self.playwright = await async_playwright().start()
+        async with self._lock:
+            while len(self._browsers) < self.size:
+                self._browsers.append(await self._launch())
+
+    async def close(self):
+        """Close every browser and stop Playwright."""
+        self._closing = True
+        for task in list(self._tasks):
+            task.cancel()
+        async with self._lock:
+            browsers, self._browsers = self._browsers, []
+        for entry in browsers:
+            await self._close_browser(entry)
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    @asynccontextmanager
+    async def context(self, **context_options) -> AsyncIterator[BrowserContext]:
+        """Check out a browser and yield a fresh, isolated context on it."""
+        entry = await self._checkout()
+        context = None
+        try:
+            context = await entry.browser.new_context(**context_options)
+            context.on("page", lambda _page: self._count_page(entry))
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            entry.active_contexts -= 1
+            await self._after_release(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool state for monitoring."""
+        return {
+            "size": self.size,
+            "launched": self.launched,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+            "browsers": [
+                {
+                    "pagesServed": entry.pages_served,
+                    "activeContexts": entry.active_contexts,
+                    "memoryMb": entry.memory_mb(),
+                }
+                for entry in self._browsers
+            ],
+        }
+
+    def _count_page(self, entry: _PooledBrowser):
+        entry.pages_served += 1
+
+    async def _checkout(self) -> _PooledBrowser:
+        """Pick the least busy healthy browser, replacing dead ones first."""
+        if self.playwright is None:
+            raise RuntimeError("BrowserPool.start() must be called before use")
+        async with self._lock:
+            for entry in list(self._browsers):
+                if entry.crashed or not entry.browser.is_connected():
+                    self._browsers.remove(entry)
+            while len(self._browsers) < self.size:
+                self._browsers.append(await self._launch())
+            entry = min(self._browsers, key=lambda b: b.active_contexts)
+            entry.active_contexts += 1
+            return entry
+
+    async def _launch(self) -> _PooledBrowser:
+        """Launch a browser; caller must hold the lock so PIDs can be attributed."""
+        before = self._child_pids()
+        browser = await self.playwright.chromium.launch(**self.launch_options)
+        new_pids = self._child_pids() - before
+        roots = set()
+        if psutil is not None:
+            for pid in new_pids:
+                try:
+                    if psutil.Process(pid).ppid() not in new_pids:
+                        roots.add(pid)
+                except psutil.Error:
+                    pass
+        entry = _PooledBrowser(browser, roots)
+        browser.on("disconnected", lambda _browser: self._on_disconnected(entry))
+        self.launched += 1
+        return entry
+
+    def _child_pids(self) -> Set[int]:
+        if psutil is None:
+            return set()
+        try:
+            return {p.pid for p in psutil.Process(os.getpid()).children(recursive=True)}
+        except psutil.Error:
+            return set()
+
+    def _on_disconnected(self, entry: _PooledBrowser):
+        """Mark an unexpectedly closed browser as crashed and replace it."""
+        if entry.retiring or self._closing:
+            return
+        entry.crashed = True
+        self.crashed += 1
+        self._spawn(self._replenish())
+
+    async def _after_release(self, entry: _PooledBrowser):
+        """Retire a browser that hit its page or memory budget."""
+        if entry.crashed or self._closing:
+            return
+        if not entry.retiring and self._needs_recycle(entry):
+            entry.retiring = True
+            self.recycled += 1
+            async with self._lock:
+                if entry in self._browsers:
+                    self._browsers.remove(entry)
+            self._spawn(self._replenish())
+        if entry.retiring and entry.active_contexts == 0:
+            await self._close_browser(entry)
+
+    def _needs_recycle(self, entry: _PooledBrowser) -> bool:
+        if self.max_pages and entry.pages_served >= self.max_pages:
+            return True
+        if self.max_memory_mb:
+            memory = entry.memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                return True
+        return False
+
+    async def _replenish(self):
+        """Launch browsers until the pool is back at full size."""
+        async with self._lock:
+            self._browsers = [
+                b for b in self._browsers if not b.crashed and b.browser.is_connected()
+            ]
+            while not self._closing and len(self._browsers) < self.size:
+                self._browsers.append(await self._launch())
+
+    async def _close_browser(self, entry: _PooledBrowser):
+        entry.retiring = True
+        try:
+            await entry.browser.close()
+        except Exception:
+            pass
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,190 @@
+"""
+Result cache in front of scrape_url(): in-memory LRU with an optional
+sqlite tier, keyed by normalized URL plus scrape options.
+"""
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from scraper import ScrapeOptions
+from urls import normalize_url
+
+
+@dataclass
+class CacheDirectives:
+    """Cache-Control style flags supplied with a scrape request."""
+
+    no_cache: bool = False  # Skip the lookup but store the fresh result (refresh)
+    no_store: bool = False  # Bypass the cache entirely
+    max_age: Optional[float] = None  # Only accept entries at most this old
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "CacheDirectives":
+        directives = cls()
+        if not value:
+            return directives
+        for part in value.split(","):
+            name, _, arg = part.strip().lower().partition("=")
+            if name == "no-cache":
+                directives.no_cache = True
+            elif name == "no-store":
+                directives.no_store = True
+            elif name == "max-age":
+                try:
+                    directives.max_age = float(arg)
+                except ValueError:
+                    pass
+        return directives
+
+
+def cache_key(url: str, options: ScrapeOptions) -> str:
+    """Normalized URL plus every scrape option that can change the result."""
+    return normalize_url(url) + "|" + json.dumps(asdict(options), sort_keys=True)
+
+
+class SqliteCacheTier:
+    """On-disk cache tier so entries survive restarts and exceed memory."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT, stored_at REAL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[2] <= time.time():
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return row
+
+    def set(self, key: str, value: str, stored_at: float, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, stored_at, expires_at),
+            )
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def is_failed_result(result: Dict[str, Any]) -> bool:
+    """
+    True when the scrape failed rather than returned the page: the browser
+    errored, or nothing was extracted (fetch errors, 4xx/5xx, empty body).
+    A static fetch error recovered by the JS fallback still counts as success.
+    """
+    if any(error.get("phase") == "render" for error in result.get("errors", ())):
+        return True
+    return not any(
+        section.get("content", {}).get("text") for section in result.get("sections", ())
+    )
+
+
+class ResultCache:
+    """
+    TTL cache of scrape results. The memory tier is an LRU bounded by entry
+    count and total serialized bytes; the optional disk tier backs it.
+    Failed results are kept only for error_ttl (0 disables storing them), so
+    a transient outage is not replayed for the full TTL.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 disk_path: Optional[str] = None, error_ttl: float = 30.0):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (serialized result, stored_at, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._bytes = 0
+        self.disk = SqliteCacheTier(disk_path) if disk_path else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, url: str, options: ScrapeOptions,
+                  directives: Optional[CacheDirectives] = None) -> Optional[Dict[str, Any]]:
+        """Cached result for url/options, or None on a miss or bypass."""
+        directives = directives or CacheDirectives()
+        if directives.no_cache or directives.no_store:
+            return None
+        key = cache_key(url, options)
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= time.time():
+            self._remove(key)
+            entry = None
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self._put(key, entry)
+        if entry is None or (directives.max_age is not None and time.time() - entry[1] > directives.max_age):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return json.loads(entry[0])
+
+    async def set(self, url: str, options: ScrapeOptions, result: Dict[str, Any],
+                  directives: Optional[CacheDirectives] = None):
+        """Store a fresh result unless the request asked for no-store."""
+        if directives is not None and directives.no_store:
+            return
+        ttl = self.error_ttl if is_failed_result(result) else self.ttl
+        if ttl <= 0:
+            return
+        key = cache_key(url, options)
+        stored_at = time.time()
+        entry = (json.dumps(result), stored_at, stored_at + ttl)
+        self._put(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, *entry)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk": self.disk is not None,
+        }
+
+    def _put(self, key: str, entry: Tuple[str, float, float]):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            # Too large for the memory tier; the disk tier may still hold it
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[0])
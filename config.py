@@ -0,0 +1,152 @@
+"""
+Runtime configuration loaded from environment variables.
+"""
+import os
+from dataclasses import dataclass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Settings:
+    """Tunable settings for the shared scraping resources."""
+
+    # Browser pool
+    browser_pool_size: int = 2
+    browser_max_pages: int = 100  # Recycle a browser after serving this many pages
+    browser_max_memory_mb: int = 1024  # Recycle a browser above this RSS (0 disables)
+
+    # Shared HTTP client
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_max_connections_per_host: int = 10
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 30.0
+    http2: bool = False  # Requires the optional h2 package
+    static_max_bytes: int = 10 * 1024 * 1024  # Abort static fetches above this body size (0 disables)
+
+    # Scheduler shared by batch scrapes
+    scheduler_max_concurrency: int = 10
+    scheduler_max_per_host: int = 2
+    batch_max_urls: int = 100
+
+    # Upper bounds for POST /crawl requests
+    crawl_max_pages: int = 500
+    crawl_max_depth: int = 5
+
+    # Per-host pacing of page requests (static fetches and browser navigations)
+    politeness_enabled: bool = True
+    politeness_rate: float = 2.0  # Requests per second per host (token bucket refill)
+    politeness_burst: int = 4
+    politeness_max_per_host: int = 2
+    politeness_max_retry_after: float = 300.0  # Longest Retry-After pause honoured
+    robots_enabled: bool = True  # Fetch robots.txt for Crawl-delay
+    robots_obey_disallow: bool = False  # Also refuse URLs robots.txt disallows
+    robots_ttl: float = 3600.0
+
+    # Static fetch retries for transient failures (timeouts, resets, 429/5xx)
+    retry_max_attempts: int = 3
+    retry_base_delay: float = 0.25  # Backoff ceiling of the first retry, doubled per attempt
+    retry_max_delay: float = 4.0
+    retry_deadline: float = 10.0  # Total seconds across attempts and backoff
+
+    # Seconds a scrape may take across all phases when the request sets no
+    # deadline (0 = unbounded; each phase keeps its own timeout)
+    default_deadline: float = 0.0
+
+    # Background job queue
+    jobs_workers: int = 2
+    jobs_max_queue: int = 100  # POST /jobs is refused beyond this many queued jobs
+    jobs_retention: float = 3600.0  # Seconds finished jobs and results are kept
+    jobs_db_path: str = ""  # sqlite file persisting jobs across restarts; empty disables it
+
+    # Result cache
+    cache_enabled: bool = True
+    cache_ttl: float = 300.0
+    cache_error_ttl: float = 30.0  # Failed results; 0 never caches them
+    cache_max_entries: int = 256
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_disk_path: str = ""  # sqlite file for the on-disk tier; empty disables it
+
+    # ETag/Last-Modified validators kept for conditional refetches
+    revalidation_max_entries: int = 1024
+
+    # Run HTML -> sections parsing in a process pool (0 workers = one per core)
+    parse_pool_enabled: bool = False
+    parse_pool_workers: int = 0
+
+    # JSON file with noise filter allow/deny rules; empty uses the built-in rules
+    noise_rules_path: str = ""
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from SCRAPER_* environment variables."""
+        return cls(
+            browser_pool_size=_env_int("SCRAPER_BROWSER_POOL_SIZE", cls.browser_pool_size),
+            browser_max_pages=_env_int("SCRAPER_BROWSER_MAX_PAGES", cls.browser_max_pages),
+            browser_max_memory_mb=_env_int("SCRAPER_BROWSER_MAX_MEMORY_MB", cls.browser_max_memory_mb),
+            http_max_connections=_env_int("SCRAPER_HTTP_MAX_CONNECTIONS", cls.http_max_connections),
+            http_max_keepalive_connections=_env_int(
+                "SCRAPER_HTTP_MAX_KEEPALIVE", cls.http_max_keepalive_connections
+            ),
+            http_max_connections_per_host=_env_int(
+                "SCRAPER_HTTP_MAX_PER_HOST", cls.http_max_connections_per_host
+            ),
+            http_keepalive_expiry=_env_float("SCRAPER_HTTP_KEEPALIVE_EXPIRY", cls.http_keepalive_expiry),
+            http_timeout=_env_float("SCRAPER_HTTP_TIMEOUT", cls.http_timeout),
+            http2=_env_bool("SCRAPER_HTTP2", cls.http2),
+            static_max_bytes=_env_int("SCRAPER_STATIC_MAX_BYTES", cls.static_max_bytes),
+            scheduler_max_concurrency=_env_int(
+                "SCRAPER_MAX_CONCURRENCY", cls.scheduler_max_concurrency
+            ),
+            scheduler_max_per_host=_env_int("SCRAPER_MAX_PER_HOST", cls.scheduler_max_per_host),
+            batch_max_urls=_env_int("SCRAPER_BATCH_MAX_URLS", cls.batch_max_urls),
+            crawl_max_pages=_env_int("SCRAPER_CRAWL_MAX_PAGES", cls.crawl_max_pages),
+            crawl_max_depth=_env_int("SCRAPER_CRAWL_MAX_DEPTH", cls.crawl_max_depth),
+            politeness_enabled=_env_bool("SCRAPER_POLITENESS", cls.politeness_enabled),
+            politeness_rate=_env_float("SCRAPER_POLITENESS_RATE", cls.politeness_rate),
+            politeness_burst=_env_int("SCRAPER_POLITENESS_BURST", cls.politeness_burst),
+            politeness_max_per_host=_env_int("SCRAPER_POLITENESS_MAX_PER_HOST", cls.politeness_max_per_host),
+            politeness_max_retry_after=_env_float(
+                "SCRAPER_POLITENESS_MAX_RETRY_AFTER", cls.politeness_max_retry_after
+            ),
+            robots_enabled=_env_bool("SCRAPER_ROBOTS", cls.robots_enabled),
+            robots_obey_disallow=_env_bool("SCRAPER_ROBOTS_OBEY_DISALLOW", cls.robots_obey_disallow),
+            robots_ttl=_env_float("SCRAPER_ROBOTS_TTL", cls.robots_ttl),
+            retry_max_attempts=_env_int("SCRAPER_RETRY_MAX_ATTEMPTS", cls.retry_max_attempts),
+            retry_base_delay=_env_float("SCRAPER_RETRY_BASE_DELAY", cls.retry_base_delay),
+            retry_max_delay=_env_float("SCRAPER_RETRY_MAX_DELAY", cls.retry_max_delay),
+            retry_deadline=_env_float("SCRAPER_RETRY_DEADLINE", cls.retry_deadline),
+            default_deadline=_env_float("SCRAPER_DEFAULT_DEADLINE", cls.default_deadline),
+            jobs_workers=_env_int("SCRAPER_JOBS_WORKERS", cls.jobs_workers),
+            jobs_max_queue=_env_int("SCRAPER_JOBS_MAX_QUEUE", cls.jobs_max_queue),
+            jobs_retention=_env_float("SCRAPER_JOBS_RETENTION", cls.jobs_retention),
+            jobs_db_path=os.getenv("SCRAPER_JOBS_DB_PATH", cls.jobs_db_path),
+            cache_enabled=_env_bool("SCRAPER_CACHE_ENABLED", cls.cache_enabled),
+            cache_ttl=_env_float("SCRAPER_CACHE_TTL", cls.cache_ttl),
+            cache_error_ttl=_env_float("SCRAPER_CACHE_ERROR_TTL", cls.cache_error_ttl),
+            cache_max_entries=_env_int("SCRAPER_CACHE_MAX_ENTRIES", cls.cache_max_entries),
+            cache_max_bytes=_env_int("SCRAPER_CACHE_MAX_BYTES", cls.cache_max_bytes),
+            cache_disk_path=os.getenv("SCRAPER_CACHE_DISK_PATH", cls.cache_disk_path),
+            revalidation_max_entries=_env_int(
+                "SCRAPER_REVALIDATION_MAX_ENTRIES", cls.revalidation_max_entries
+            ),
+            parse_pool_enabled=_env_bool("SCRAPER_PARSE_POOL", cls.parse_pool_enabled),
+            parse_pool_workers=_env_int("SCRAPER_PARSE_POOL_WORKERS", cls.parse_pool_workers),
+            noise_rules_path=os.getenv("SCRAPER_NOISE_RULES_PATH", cls.noise_rules_path),
+        )
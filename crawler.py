@@ -0,0 +1,242 @@
+"""
+Same-site crawler built on the regular scrape path.
+
+Starting from a seed URL, pages are taken from a priority frontier
+(shallowest first, then shorter paths). Each page is scraped through the
+injected fetch function, which goes through the scheduler, cache and the
+Scraper's static/JS strategy. Every link in the page feeds the frontier.
+URLs are normalized and deduplicated with a Bloom filter, so memory stays
+bounded however many links are discovered.
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import hashlib
+import heapq
+import math
+
+from dedup import NearDuplicateTracker
+from urls import normalize_url
+
+# Links to these are never HTML pages worth scraping
+SKIPPED_EXTENSIONS = frozenset((
+    ".7z", ".avi", ".bmp", ".css", ".csv", ".doc", ".docx", ".exe", ".gif", ".gz", ".ico",
+    ".jpeg", ".jpg", ".js", ".json", ".mov", ".mp3", ".mp4", ".pdf", ".png", ".ppt",
+    ".pptx", ".rar", ".rss", ".svg", ".tar", ".tgz", ".webm", ".webp", ".woff", ".woff2",
+    ".xls", ".xlsx", ".xml", ".zip",
+))
+
+PageFetcher = Callable[[str], Awaitable[Tuple[Dict[str, Any], bool]]]
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives. False positives (at
+    about error_rate once capacity items are added) make the crawler skip an
+    unseen URL, which is acceptable for crawl dedup.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add item; returns False if it was (probably) already present."""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self._bits[pos >> 3] & mask:
+                self._bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+
+class Frontier:
+    """Priority queue of (url, depth): shallow pages first, then short paths."""
+
+    def __init__(self):
+        self._heap: List[Tuple[Tuple[int, int, int], int, str, int]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def priority(url: str, depth: int) -> Tuple[int, int, int]:
+        parts = urlsplit(url)
+        segments = len([segment for segment in parts.path.split("/") if segment])
+        return depth, segments, 1 if parts.query else 0
+
+    def push(self, url: str, depth: int):
+        # The sequence number keeps discovery order among equal priorities
+        heapq.heappush(self._heap, (self.priority(url, depth), self._seq, url, depth))
+        self._seq += 1
+
+    def pop(self) -> Tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+
+class Crawler:
+    """
+    Crawls one site breadth-first with concurrent workers and yields an event
+    per page as soon as it is scraped, then a summary.
+    """
+
+    def __init__(self, fetch: PageFetcher, max_depth: int = 2, max_pages: int = 50,
+                 concurrency: int = 4, allow_subdomains: bool = False,
+                 allowed_domains: Optional[Iterable[str]] = None,
+                 near_duplicates: Optional[NearDuplicateTracker] = None):
+        self.fetch = fetch
+        self.max_depth = max_depth
+        self.max_pages = max(1, max_pages)
+        self.concurrency = max(1, concurrency)
+        self.allow_subdomains = allow_subdomains
+        self.allowed_domains = {domain.lower().lstrip(".") for domain in (allowed_domains or ())}
+        self.near_duplicates = near_duplicates
+        # Discovered links far outnumber crawled pages
+        self.seen = BloomFilter(capacity=self.max_pages * 50)
+        self.frontier = Frontier()
+        self.scheduled = 0
+        self.crawled = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.out_of_scope = 0
+
+    def _in_scope(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return False
+        if any(parts.path.lower().endswith(ext) for ext in SKIPPED_EXTENSIONS):
+            return False
+        host = (parts.hostname or "").lower()
+        for domain in self.allowed_domains:
+            if host == domain or (self.allow_subdomains and host.endswith("." + domain)):
+                return True
+        return False
+
+    def _discover(self, url: str, depth: int):
+        """Queue url at depth unless it is off-site, not a page or already seen."""
+        url = normalize_url(url)
+        if not self._in_scope(url):
+            self.out_of_scope += 1
+            return
+        if not self.seen.add(url):
+            self.duplicates += 1
+            return
+        self.frontier.push(url, depth)
+
+    @staticmethod
+    def page_links(result: Dict[str, Any]) -> List[str]:
+        """
+        The page's links: every a[href] when the scrape collected them
+        (collect_links), else the links of its sections, which cover only
+        landmark content within the section and link limits.
+        """
+        if result.get("links") is not None:
+            return result["links"]
+        return [
+            link["href"]
+            for section in result.get("sections", ())
+            for link in section.get("content", {}).get("links", ())
+            if link.get("href")
+        ]
+
+    async def crawl(self, seed: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {"type": "page", ...} per scraped page, then {"type": "summary", ...}."""
+        seed_host = (urlsplit(seed).hostname or "").lower()
+        self.allowed_domains.add(seed_host)
+        self._discover(seed, 0)
+
+        events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        work_available = asyncio.Condition()
+        in_flight = 0
+
+        async def worker():
+            nonlocal in_flight
+            while True:
+                async with work_available:
+                    # Wait for work, or stop once nothing is queued or running
+                    while not self.frontier or self.scheduled >= self.max_pages:
+                        if in_flight == 0 or self.scheduled >= self.max_pages:
+                            work_available.notify_all()
+                            return
+                        await work_available.wait()
+                    url, depth = self.frontier.pop()
+                    self.scheduled += 1
+                    in_flight += 1
+                try:
+                    event = await self._crawl_page(url, depth)
+                finally:
+                    async with work_available:
+                        in_flight -= 1
+                        work_available.notify_all()
+                await events.put(event)
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            finally:
+                await events.put(None)
+
+        runner = asyncio.create_task(run_workers())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await runner
+        finally:
+            # Client went away or the consumer stopped early: stop the workers
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+
+        yield {"type": "summary", **self.stats()}
+
+    async def _crawl_page(self, url: str, depth: int) -> Dict[str, Any]:
+        try:
+            result, cached = await self.fetch(url)
+        except Exception as e:
+            self.failed += 1
+            return {"type": "page", "url": url, "depth": depth, "error": str(e)}
+        self.crawled += 1
+        event: Dict[str, Any] = {"type": "page", "url": url, "depth": depth}
+        if self.near_duplicates is not None:
+            result, duplicate_of = self.near_duplicates.check(url, result)
+            if duplicate_of is not None:
+                event["nearDuplicateOf"] = duplicate_of
+                if self.near_duplicates.mode == "skip":
+                    # Its links were already followed from the original
+                    return {**event, "cached": cached}
+        # Links of the deepest pages would only be discarded
+        if depth < self.max_depth:
+            for link in self.page_links(result):
+                self._discover(link, depth + 1)
+        return {**event, "result": result, "cached": cached}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "crawled": self.crawled,
+            "failed": self.failed,
+            "discovered": self.seen.count,
+            "queued": len(self.frontier),
+            "duplicates": self.duplicates,
+            "outOfScope": self.out_of_scope,
+            **(self.near_duplicates.stats() if self.near_duplicates is not None else {}),
+        }
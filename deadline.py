@@ -0,0 +1,71 @@
+"""
+One time budget shared by every phase of a scrape.
+"""
+from typing import Awaitable, Optional, TypeVar
+import asyncio
+import time
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline expired during phase."""
+
+    def __init__(self, phase: str):
+        super().__init__(f"Deadline exceeded during {phase}")
+        self.phase = phase
+
+
+class Deadline:
+    """Absolute expiry on the monotonic clock; seconds=None means unbounded."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        # Phase in which the deadline was first hit, if any
+        self.exceeded_in: Optional[str] = None
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def remaining(self, cap: Optional[float] = None) -> Optional[float]:
+        """Seconds left, at most cap; None when neither bounds it."""
+        if self.expires_at is None:
+            return cap
+        left = max(0.0, self.expires_at - time.monotonic())
+        return left if cap is None else min(cap, left)
+
+    def timeout_ms(self, cap: float) -> float:
+        """Playwright timeout in milliseconds: the time left, at most cap seconds."""
+        return max(1.0, self.remaining(cap) * 1000)
+
+    def check(self, phase: str):
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired:
+            raise self.exceeded(phase)
+
+    def exceeded(self, phase: str) -> DeadlineExceeded:
+        """Record phase as the one that ran out of time and build the error."""
+        if self.exceeded_in is None:
+            self.exceeded_in = phase
+        return DeadlineExceeded(phase)
+
+    async def run(self, awaitable: Awaitable[T], phase: str, cap: Optional[float] = None) -> T:
+        """Await awaitable within the remaining time (and cap), else raise DeadlineExceeded."""
+        if self.expired:
+            # Cancel as wait_for would: a coroutine never starts, and a task
+            # or gather passed in stops its children and is waited on here
+            future = asyncio.ensure_future(awaitable)
+            future.cancel()
+            await asyncio.gather(future, return_exceptions=True)
+            raise self.exceeded(phase)
+        timeout = self.remaining(cap)
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            if self.expired:
+                raise self.exceeded(phase) from None
+            raise
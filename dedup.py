@@ -0,0 +1,194 @@
+"""
+Near-duplicate detection for sections and pages.
+
+Pagination variants, tracking-parameter URLs and site chrome repeated on
+every page produce sections whose text is almost, but not exactly, the
+same, so an exact hash misses them. Each text gets a 64-bit SimHash over
+word 3-shingles, and two texts are near-duplicates when their fingerprints
+differ in at most max_distance bits.
+
+SimHashIndex finds candidates without comparing against every stored
+fingerprint. The fingerprint is split into max_distance + 1 bands, and two
+fingerprints within max_distance bits must agree exactly on at least one
+band (pigeonhole), so bucketing by band is an LSH with no false negatives.
+"""
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import re
+
+FINGERPRINT_BITS = 64
+DEFAULT_MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+# Bit-sliced accumulation: each fingerprint bit gets its own LANE_BITS-wide
+# counter inside one big int, so a feature adds to all 64 counters in one sum
+LANE_BITS = 24
+_LANE_MASK = (1 << LANE_BITS) - 1
+_SPREAD_BYTE = [
+    sum(1 << (bit * LANE_BITS) for bit in range(8) if byte >> bit & 1) for byte in range(256)
+]
+
+
+def _spread(value: int) -> int:
+    """value with bit i moved to the bottom of lane i."""
+    digest = value.to_bytes(8, "little")
+    return sum(_SPREAD_BYTE[byte] << (index * 8 * LANE_BITS) for index, byte in enumerate(digest))
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of text's word shingles; None when text has no words."""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    if len(words) < SHINGLE_SIZE:
+        shingles = Counter([" ".join(words)])
+    else:
+        shingles = Counter(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    total = sum(shingles.values())
+    # Per-bit count of features with the bit set; the bit is set in the
+    # fingerprint when that is more than half of all features
+    set_counts = sum(_spread(_feature_hash(shingle)) * count for shingle, count in shingles.items())
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if 2 * (set_counts >> (bit * LANE_BITS) & _LANE_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def format_fingerprint(fingerprint: int) -> str:
+    return f"{fingerprint:016x}"
+
+
+def parse_fingerprint(value: Optional[str]) -> Optional[int]:
+    return int(value, 16) if value else None
+
+
+class SimHashIndex:
+    """
+    Fingerprints keyed by an owner (a URL or section reference), queried
+    for a stored fingerprint within max_distance bits. The oldest entries
+    are evicted beyond max_entries.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, max_entries: int = 100000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.bands = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        self._entries: "OrderedDict[int, str]" = OrderedDict()
+        # (band number, band value) -> fingerprints sharing it
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, fingerprint: int) -> Iterable[Tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        for band in range(self.bands):
+            # The last band takes the leftover high bits
+            if band == self.bands - 1:
+                yield band, fingerprint >> (band * self._band_bits)
+            else:
+                yield band, fingerprint >> (band * self._band_bits) & mask
+
+    def match(self, fingerprint: int) -> Optional[str]:
+        """Key of the closest stored fingerprint within max_distance, if any."""
+        best: Optional[Tuple[int, str]] = None
+        for band_key in self._band_keys(fingerprint):
+            for candidate in self._buckets.get(band_key, ()):
+                distance = hamming(fingerprint, candidate)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, self._entries[candidate])
+        return best[1] if best is not None else None
+
+    def add(self, fingerprint: int, key: str):
+        if fingerprint in self._entries:
+            return
+        self._entries[fingerprint] = key
+        for band_key in self._band_keys(fingerprint):
+            self._buckets.setdefault(band_key, []).append(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._remove(*self._entries.popitem(last=False))
+
+    def _remove(self, fingerprint: int, _key: str):
+        for band_key in self._band_keys(fingerprint):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.remove(fingerprint)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def check(self, fingerprint: int, key: str) -> Optional[str]:
+        """Key of a near-duplicate already stored; otherwise store fingerprint under key."""
+        duplicate_of = self.match(fingerprint)
+        if duplicate_of is None:
+            self.add(fingerprint, key)
+        return duplicate_of
+
+
+def page_fingerprint(sections: Iterable[Dict[str, Any]]) -> Optional[int]:
+    """SimHash of a page's combined section text."""
+    return simhash(" ".join(section.get("content", {}).get("text", "") for section in sections))
+
+
+class NearDuplicateTracker:
+    """
+    Cross-page near-duplicate detection for one crawl or batch. Sections
+    carry the fingerprints computed during extraction. A page whose combined
+    text matches an earlier page is reported as a duplicate of it, and
+    sections already seen on an earlier page (site chrome, repeated listings)
+    are flagged or, in skip mode, dropped.
+    """
+
+    def __init__(self, mode: str = "flag", max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.mode = mode
+        self.pages = SimHashIndex(max_distance)
+        self.sections = SimHashIndex(max_distance)
+        self.duplicate_pages = 0
+        self.duplicate_sections = 0
+
+    def check(self, url: str, result: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Returns (result, url of the page it duplicates or None). The result is
+        copied, never modified, when sections are flagged or dropped.
+        """
+        sections = result.get("sections", [])
+        fingerprint = page_fingerprint(sections)
+        duplicate_of = self.pages.check(fingerprint, url) if fingerprint is not None else None
+        if duplicate_of is not None and duplicate_of != url:
+            self.duplicate_pages += 1
+            return result, duplicate_of
+
+        kept = []
+        changed = False
+        for section in sections:
+            section_fingerprint = parse_fingerprint(section.get("fingerprint"))
+            if section_fingerprint is None or section.get("nearDuplicateOf"):
+                kept.append(section)
+                continue
+            reference = f"{url}#{section['id']}"
+            original = self.sections.check(section_fingerprint, reference)
+            if original is None or original.startswith(url + "#"):
+                kept.append(section)
+                continue
+            self.duplicate_sections += 1
+            changed = True
+            if self.mode == "flag":
+                kept.append({**section, "nearDuplicateOf": original})
+        if changed:
+            result = {**result, "sections": kept}
+        return result, None
+
+    def stats(self) -> Dict[str, int]:
+        return {"duplicatePages": self.duplicate_pages, "duplicateSections": self.duplicate_sections}
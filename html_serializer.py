@@ -0,0 +1,129 @@
+"""
+Truncating HTML serializer for section rawHtml.
+
+Serializing a whole <main> or <body> with Node.html only to keep its first
+2000 characters builds a multi-megabyte string for nothing. This serializer
+walks the subtree and stops as soon as the budget is reached. It never cuts
+inside a tag or an entity, so the output always ends on a token boundary.
+"""
+from typing import Any, List, Mapping, Optional, Tuple
+
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+))
+RAW_TEXT_TAGS = frozenset(("script", "style", "xmp", "iframe", "noembed", "noframes", "plaintext"))
+
+TRUNCATION_MARKER = "..."
+
+
+def _escape_text(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attribute(value: str) -> str:
+    return value.replace("&", "&amp;").replace('"', "&quot;")
+
+
+def _start_tag(tag: str, attributes: Mapping[str, Optional[str]]) -> str:
+    parts = [tag]
+    for name, value in attributes.items():
+        parts.append(name if value is None else f'{name}="{_escape_attribute(value)}"')
+    return "<" + " ".join(parts) + ">"
+
+
+class _Budget(Exception):
+    """Raised internally once the budget is exhausted."""
+
+
+class TruncatingSerializer:
+    """
+    Serializes a selectolax subtree up to max_chars. Descendants whose mem_id
+    is in refs are replaced by an empty element pointing at their section.
+    """
+
+    def __init__(self, max_chars: int, refs: Optional[Mapping[int, str]] = None):
+        self.max_chars = max_chars
+        self.refs = refs or {}
+        self._parts: List[str] = []
+        self._size = 0
+
+    def serialize(self, root) -> Tuple[str, bool]:
+        """Return (html, truncated)."""
+        try:
+            self._walk(root)
+            truncated = False
+        except _Budget:
+            truncated = True
+        html = "".join(self._parts)
+        if truncated:
+            html += TRUNCATION_MARKER
+        return html, truncated
+
+    def _emit(self, token: str):
+        if self._size + len(token) > self.max_chars:
+            raise _Budget()
+        self._parts.append(token)
+        self._size += len(token)
+
+    def _emit_text(self, text: str, raw: bool):
+        escaped = text if raw else _escape_text(text)
+        remaining = self.max_chars - self._size
+        if len(escaped) <= remaining:
+            self._parts.append(escaped)
+            self._size += len(escaped)
+            return
+        # Keep the longest prefix whose escaped form fits, without splitting an
+        # entity; an escaped character is at most 5 long, so never overshoot
+        cut = remaining
+        piece = text[:cut] if raw else _escape_text(text[:cut])
+        while cut > 0 and len(piece) > remaining:
+            cut -= max(1, (len(piece) - remaining) // 5)
+            piece = text[:cut] if raw else _escape_text(text[:cut])
+        if piece:
+            self._parts.append(piece)
+            self._size += len(piece)
+        raise _Budget()
+
+    def _walk(self, root):
+        # Entries are (node, None) on entry and (None, end tag) on exit
+        stack: List[Tuple[Any, Optional[str]]] = [(root, None)]
+        raw_depth: List[bool] = [False]
+        while stack:
+            node, end_tag = stack.pop()
+            if node is None:
+                raw_depth.pop()
+                self._emit(end_tag)
+                continue
+
+            tag = node.tag
+            if tag == "-text":
+                self._emit_text(node.text(deep=False), raw_depth[-1])
+                continue
+            if tag == "_comment":
+                self._emit(node.html or "")
+                continue
+            if tag.startswith(("-", "_", "!")):
+                continue
+            if node is not root and self.refs:
+                section_id = self.refs.get(node.mem_id)
+                if section_id is not None:
+                    self._emit(f'<{tag} data-section-ref="{section_id}"></{tag}>')
+                    continue
+
+            self._emit(_start_tag(tag, node.attributes))
+            if tag in VOID_TAGS:
+                continue
+            stack.append((None, f"</{tag}>"))
+            raw_depth.append(tag in RAW_TEXT_TAGS)
+            children = []
+            child = node.child
+            while child is not None:
+                children.append(child)
+                child = child.next
+            stack.extend((child, None) for child in reversed(children))
+
+
+def serialize_truncated(node, max_chars: int, refs: Optional[Mapping[int, str]] = None) -> Tuple[str, bool]:
+    """Serialize node, stopping at max_chars on a tag boundary."""
+    return TruncatingSerializer(max_chars, refs).serialize(node)
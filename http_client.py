@@ -0,0 +1,103 @@
+"""
+Shared, connection-pooled httpx client for static fetches.
+"""
+from typing import Callable, Dict, Tuple
+import asyncio
+
+import httpx
+
+from config import Settings
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport and caps the number of in-flight requests per origin.
+    httpx only limits connections globally, so this adds the per-host bound.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[Tuple[bytes, bytes, int], asyncio.Semaphore] = {}
+        self._users: Dict[Tuple[bytes, bytes, int], int] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = (request.url.raw_scheme, request.url.raw_host, request.url.port or 0)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self._max_per_host)
+        self._users[key] = self._users.get(key, 0) + 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            semaphore.release()
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                # Drop idle hosts so the map does not grow without bound
+                del self._users[key]
+                del self._semaphores[key]
+
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                del self._users[key]
+                del self._semaphores[key]
+            raise
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def create_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Build the long-lived client shared by every static fetch."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=settings.http2)
+    if settings.http_max_connections_per_host:
+        transport = PerHostLimitTransport(transport, settings.http_max_connections_per_host)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=settings.http_timeout,
+        follow_redirects=True,
+    )
@@ -0,0 +1,267 @@
+"""
+Background job queue for long-running scrapes.
+
+POST /jobs enqueues a scrape and returns immediately. A fixed pool of asyncio
+workers drains the queue, and clients poll GET /jobs/{id} for the result. The
+optional sqlite store persists every state change. On startup, jobs that
+were queued or running when the process stopped are queued again.
+"""
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from scraper import ScrapeOptions
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = frozenset(("succeeded", "failed", "cancelled"))
+
+
+class QueueFullError(Exception):
+    """The job queue is at its maximum depth."""
+
+
+@dataclass
+class Job:
+    """One queued scrape and, once finished, its outcome."""
+
+    url: str
+    options: Dict[str, Any]
+    cache_control: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def scrape_options(self) -> ScrapeOptions:
+        return ScrapeOptions(**self.options)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "createdAt": _iso(self.created_at),
+            "startedAt": _iso(self.started_at),
+            "finishedAt": _iso(self.finished_at),
+            "result": self.result,
+            "cached": self.cached,
+            "error": self.error,
+        }
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class SqliteJobStore:
+    """Persists jobs so queued work and finished results survive restarts."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT, created_at REAL, finished_at REAL, data TEXT)"
+            )
+            self._conn.commit()
+
+    def save(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, finished_at, data) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, job.created_at, job.finished_at, json.dumps(asdict(job))),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def unfinished(self) -> List[Job]:
+        """Jobs that were queued or running, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [Job(**json.loads(row[0])) for row in rows]
+
+    def prune(self, finished_before: float):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+JobRunner = Callable[[Job], Awaitable[Tuple[Dict[str, Any], bool]]]
+
+
+class JobQueue:
+    """
+    Bounded queue of scrape jobs drained by a fixed number of asyncio workers.
+    runner(job) performs the scrape and returns (result, cached).
+    """
+
+    def __init__(self, runner: JobRunner, workers: int = 2, max_queue: int = 100,
+                 retention: float = 3600.0, max_finished: int = 1000,
+                 db_path: Optional[str] = None):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.retention = retention
+        self.max_finished = max_finished
+        self.store = SqliteJobStore(db_path) if db_path else None
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._jobs: Dict[str, Job] = {}
+        # Finished job ids, oldest first, for bounding memory
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._running: Dict[str, asyncio.Task] = {}
+        # Jobs with status "queued"; cancelled ids stay in _queue until a
+        # worker skips them, so its size overcounts
+        self._queued = 0
+        self._workers: List[asyncio.Task] = []
+        self.counts: Dict[str, int] = {status: 0 for status in FINISHED_STATUSES}
+
+    async def start(self):
+        """Requeue persisted unfinished jobs and start the workers."""
+        if self.store is not None:
+            for job in await asyncio.to_thread(self.store.unfinished):
+                job.status, job.started_at = "queued", None
+                self._jobs[job.id] = job
+                self._queued += 1
+                self._queue.put_nowait(job.id)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        """
+        Stop the workers. Interrupted jobs stay queued in the store and run
+        again after a restart.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.store is not None:
+            self.store.close()
+
+    async def submit(self, url: str, options: ScrapeOptions,
+                     cache_control: Optional[str] = None) -> Job:
+        """Enqueue a scrape; raises QueueFullError at max_queue queued jobs."""
+        if self._queued >= self.max_queue:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} queued)")
+        job = Job(url=url, options=asdict(options), cache_control=cache_control)
+        self._jobs[job.id] = job
+        self._queued += 1
+        await self._persist(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await asyncio.to_thread(self.store.get, job_id)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job. Finished jobs are returned unchanged.
+        Queued jobs are skipped by the worker that dequeues them.
+        """
+        job = await self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.status == "queued" and self._jobs.get(job_id) is job:
+            self._queued -= 1
+        self._finish(job, "cancelled")
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        await self._persist(job)
+        return job
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            self._queued -= 1
+            job.status, job.started_at = "running", time.time()
+            await self._persist(job)
+            task = asyncio.create_task(self.runner(job))
+            self._running[job_id] = task
+            try:
+                result, cached = await task
+                if job.status == "running":
+                    job.result, job.cached = result, cached
+                    self._finish(job, "succeeded")
+            except asyncio.CancelledError:
+                if job.status != "cancelled":
+                    # Worker shutdown rather than DELETE: leave the job queued
+                    job.status, job.started_at = "queued", None
+                    self._queued += 1
+                    await asyncio.shield(self._persist(job))
+                    raise
+            except Exception as e:
+                if job.status == "running":
+                    job.error = str(e)
+                    self._finish(job, "failed")
+            finally:
+                self._running.pop(job_id, None)
+            await self._persist(job)
+
+    def _finish(self, job: Job, status: str):
+        job.status, job.finished_at = status, time.time()
+        self.counts[status] += 1
+        self._finished[job.id] = None
+        # Forget the oldest finished jobs; the store still has them if enabled
+        cutoff = time.time() - self.retention
+        while self._finished:
+            oldest = next(iter(self._finished))
+            old = self._jobs.get(oldest)
+            if len(self._finished) <= self.max_finished and old is not None and old.finished_at >= cutoff:
+                break
+            del self._finished[oldest]
+            self._jobs.pop(oldest, None)
+
+    async def _persist(self, job: Job):
+        if self.store is None:
+            return
+        await asyncio.to_thread(self.store.save, job)
+        if job.finished:
+            await asyncio.to_thread(self.store.prune, time.time() - self.retention)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "queued": self._queued,
+            "running": len(self._running),
+            "succeeded": self.counts["succeeded"],
+            "failed": self.counts["failed"],
+            "cancelled": self.counts["cancelled"],
+            "persistent": self.store is not None,
+        }
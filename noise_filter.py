@@ -0,0 +1,164 @@
+"""
+Compiled noise filter removing cookie banners, modals, popups and overlays.
+
+The deny rules are compiled into one regex per attribute and checked while
+walking a single candidate list (every element carrying one of the rule
+attributes), instead of one substring-attribute CSS query per rule.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import re
+
+
+@dataclass(frozen=True)
+class NoiseRule:
+    """Substring match against one or more attributes, like [class*="cookie"]."""
+
+    pattern: str
+    attributes: Tuple[str, ...] = ("class", "id")
+    name: str = field(default="", compare=False)
+
+    @property
+    def label(self) -> str:
+        return self.name or f"{'|'.join(self.attributes)}*={self.pattern}"
+
+
+DEFAULT_DENY_RULES: Tuple[NoiseRule, ...] = (
+    NoiseRule("cookie"),
+    NoiseRule("banner"),
+    NoiseRule("modal"),
+    NoiseRule("popup"),
+    NoiseRule("overlay", ("class",)),
+)
+
+
+def _rules_from_config(entries: Iterable[Any]) -> List[NoiseRule]:
+    rules = []
+    for entry in entries:
+        if isinstance(entry, str):
+            rules.append(NoiseRule(entry))
+        else:
+            rules.append(NoiseRule(
+                entry["pattern"],
+                tuple(entry.get("attributes", ("class", "id"))),
+                entry.get("name", ""),
+            ))
+    return rules
+
+
+class NoiseFilter:
+    """
+    Removes elements whose class/id matches a deny rule, unless an allow rule
+    also matches. Per-rule hit counters accumulate across documents.
+    """
+
+    def __init__(self, deny: Sequence[NoiseRule] = DEFAULT_DENY_RULES,
+                 allow: Sequence[NoiseRule] = ()):
+        self.deny = tuple(deny)
+        self.allow = tuple(allow)
+        self._deny_patterns = self._compile(self.deny)
+        self._allow_patterns = self._compile(self.allow)
+        attributes = sorted({attr for rule in self.deny for attr in rule.attributes})
+        self._candidate_selector = ", ".join(f"[{attr}]" for attr in attributes)
+        self.hits: Dict[str, int] = {rule.label: 0 for rule in self.deny}
+        self.allowed: Dict[str, int] = {rule.label: 0 for rule in self.allow}
+        self.documents = 0
+        self.removed = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "NoiseFilter":
+        """
+        Build from {"deny": [...], "allow": [...], "include_defaults": true}.
+        Rules are pattern strings or {"pattern", "attributes", "name"} objects.
+        """
+        deny = _rules_from_config(config.get("deny", ()))
+        if config.get("include_defaults", True):
+            deny = list(DEFAULT_DENY_RULES) + deny
+        return cls(deny, _rules_from_config(config.get("allow", ())))
+
+    @classmethod
+    def from_file(cls, path: str) -> "NoiseFilter":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    @staticmethod
+    def _compile(rules: Sequence[NoiseRule]) -> Dict[str, Tuple[re.Pattern, Dict[str, NoiseRule]]]:
+        """One alternation regex per attribute; group names map back to rules."""
+        by_attribute: Dict[str, List[Tuple[str, NoiseRule]]] = {}
+        for index, rule in enumerate(rules):
+            for attr in rule.attributes:
+                by_attribute.setdefault(attr, []).append((f"r{index}", rule))
+        compiled = {}
+        for attr, entries in by_attribute.items():
+            regex = re.compile("|".join(f"(?P<{group}>{re.escape(rule.pattern)})" for group, rule in entries))
+            compiled[attr] = (regex, dict(entries))
+        return compiled
+
+    def _match(self, attributes: Dict[str, Optional[str]],
+               patterns: Dict[str, Tuple[re.Pattern, Dict[str, NoiseRule]]]) -> Optional[NoiseRule]:
+        for attr, (regex, rules) in patterns.items():
+            value = attributes.get(attr)
+            if value:
+                match = regex.search(value)
+                if match:
+                    return rules[match.lastgroup]
+        return None
+
+    def apply(self, tree) -> int:
+        """Remove noise elements from a selectolax tree in place; returns the count."""
+        self.documents += 1
+        if not self._candidate_selector:
+            return 0
+        # A selector list may yield nodes out of document order or more than
+        # once, so collect matches first and drop those nested in another match
+        matches: Dict[int, Tuple[Any, NoiseRule]] = {}
+        for node in tree.css(self._candidate_selector):
+            mem_id = node.mem_id
+            if mem_id in matches:
+                continue
+            attributes = node.attributes
+            rule = self._match(attributes, self._deny_patterns)
+            if rule is None:
+                continue
+            exemption = self._match(attributes, self._allow_patterns) if self._allow_patterns else None
+            if exemption is not None:
+                self.allowed[exemption.label] += 1
+                continue
+            matches[mem_id] = (node, rule)
+        doomed = [
+            (node, rule) for node, rule in matches.values()
+            if not self._inside(node, matches)
+        ]
+        for node, rule in doomed:
+            self.hits[rule.label] += 1
+            node.decompose()
+        self.removed += len(doomed)
+        return len(doomed)
+
+    def record(self, hits: Dict[str, int], allowed: Dict[str, int]):
+        """Add the counters of one document filtered elsewhere (a parse worker)."""
+        self.documents += 1
+        for label, count in hits.items():
+            self.hits[label] = self.hits.get(label, 0) + count
+            self.removed += count
+        for label, count in allowed.items():
+            self.allowed[label] = self.allowed.get(label, 0) + count
+
+    @staticmethod
+    def _inside(node, ids) -> bool:
+        """Whether an ancestor of node is in ids (removed along with it)."""
+        parent = node.parent
+        while parent is not None:
+            if parent.mem_id in ids:
+                return True
+            parent = parent.parent
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": self.documents,
+            "removed": self.removed,
+            "hits": dict(self.hits),
+            "allowed": dict(self.allowed),
+        }
@@ -0,0 +1,163 @@
+"""
+Pagination planning from static HTML.
+
+The browser flow follows "Next" one page at a time: scroll, find the link,
+navigate, settle. When the link is a plain href, the browser is not needed
+at all. When consecutive page URLs differ only by a counter (?page=2,
+?start=20, /page/3), the later pages can also be predicted and fetched in
+parallel through the static path. Predictions are kept only while each
+fetched page's own next link confirms the URL predicted after it.
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+import re
+
+# Query parameters holding a page number, and ones holding an item offset
+PAGE_PARAMS = frozenset(("page", "p", "pg", "paged", "pagenum", "page_num", "pagenumber", "pageno"))
+OFFSET_PARAMS = frozenset(("start", "offset", "skip", "from", "first"))
+PAGE_PATH_WORDS = frozenset(("page", "p", "pages"))
+
+_NEXT_TEXT_RE = re.compile(r"\bnext\b", re.IGNORECASE)
+
+
+@dataclass
+class PaginationPlan:
+    """Later page URLs; predicted plans list them all, otherwise only the next one."""
+
+    urls: List[str]
+    predicted: bool
+
+
+def _usable_href(href: Optional[str]) -> bool:
+    return bool(href) and not href.strip().lower().startswith(("#", "javascript:", "mailto:"))
+
+
+def find_next_url(tree, base_url: str) -> Optional[str]:
+    """Absolute URL of the page's "next" link: rel=next first, then anchors reading "Next"."""
+    for elem in tree.css('link[rel~="next"], a[rel~="next"]'):
+        href = elem.attributes.get("href")
+        if _usable_href(href):
+            return urljoin(base_url, href.strip())
+    for elem in tree.css("a"):
+        href = elem.attributes.get("href")
+        label = elem.attributes.get("aria-label") or elem.text()
+        if _usable_href(href) and _NEXT_TEXT_RE.search(label or ""):
+            return urljoin(base_url, href.strip())
+    return None
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None and value.isdigit() else None
+
+
+@dataclass
+class PagePattern:
+    """A counter in the URL: build(value) gives the page URL for that counter value."""
+
+    build: Callable[[int], str]
+    value: int
+    step: int
+
+    def urls(self, count: int) -> List[str]:
+        """URLs of the next count pages, starting with the detected next page."""
+        return [self.build(self.value + self.step * k) for k in range(count)]
+
+
+def _query_pattern(current, following) -> Optional[PagePattern]:
+    current_query = parse_qsl(current.query, keep_blank_values=True)
+    next_query = parse_qsl(following.query, keep_blank_values=True)
+    current_params = dict(current_query)
+    next_params = dict(next_query)
+    changed = [key for key in next_params if current_params.get(key) != next_params[key]]
+    if len(changed) != 1 or set(current_params) - set(next_params):
+        return None
+    key = changed[0]
+    next_value = _int(next_params[key])
+    if next_value is None:
+        return None
+    current_value = _int(current_params.get(key))
+    if current_value is None:
+        if key in current_params:
+            return None
+        # First pages usually leave the counter out
+        if key.lower() in PAGE_PARAMS:
+            current_value = 1
+        elif key.lower() in OFFSET_PARAMS:
+            current_value = 0
+        else:
+            return None
+    step = next_value - current_value
+    if step <= 0:
+        return None
+
+    def build(value: int) -> str:
+        query = urlencode([(name, str(value) if name == key else item) for name, item in next_query])
+        return urlunsplit(following._replace(query=query, fragment=""))
+
+    return PagePattern(build, next_value, step)
+
+
+def _path_pattern(current, following) -> Optional[PagePattern]:
+    current_parts = current.path.rstrip("/").split("/")
+    next_parts = following.path.rstrip("/").split("/")
+    trailing = "/" if following.path.endswith("/") else ""
+    if len(next_parts) == len(current_parts):
+        changed = [i for i, (a, b) in enumerate(zip(current_parts, next_parts)) if a != b]
+        if len(changed) != 1:
+            return None
+        index = changed[0]
+        # Only a counter named as one (/page/2, /p/3): other numeric
+        # segments are usually ids, dates or sizes
+        if index == 0 or next_parts[index - 1].lower() not in PAGE_PATH_WORDS:
+            return None
+        current_value, next_value = _int(current_parts[index]), _int(next_parts[index])
+        if current_value is None or next_value is None:
+            return None
+    elif (len(next_parts) == len(current_parts) + 2 and next_parts[:-2] == current_parts
+          and next_parts[-2].lower() in PAGE_PATH_WORDS):
+        # /blog -> /blog/page/2: the first page has no counter segment
+        index = len(next_parts) - 1
+        current_value, next_value = 1, _int(next_parts[index])
+        if next_value is None:
+            return None
+    else:
+        return None
+    step = next_value - current_value
+    if step <= 0:
+        return None
+
+    def build(value: int) -> str:
+        parts = list(next_parts)
+        parts[index] = str(value)
+        return urlunsplit(following._replace(path="/".join(parts) + trailing, fragment=""))
+
+    return PagePattern(build, next_value, step)
+
+
+def detect_pattern(current_url: str, next_url: str) -> Optional[PagePattern]:
+    """The counter that turns current_url into next_url, if it is the only difference."""
+    current, following = urlsplit(current_url), urlsplit(next_url)
+    if (current.scheme, current.netloc) != (following.scheme, following.netloc):
+        return None
+    if current.path == following.path:
+        return _query_pattern(current, following)
+    if current.query == following.query:
+        return _path_pattern(current, following)
+    return None
+
+
+def plan_pagination(tree, url: str, max_pages: int) -> Optional[PaginationPlan]:
+    """
+    Plan the pages after url, up to max_pages in total including url. None
+    when there is no followable next link.
+    """
+    if max_pages < 2:
+        return None
+    next_url = find_next_url(tree, url)
+    if next_url is None or next_url == url:
+        return None
+    pattern = detect_pattern(url, next_url)
+    if pattern is None:
+        return PaginationPlan([next_url], predicted=False)
+    return PaginationPlan(pattern.urls(max_pages - 1), predicted=True)
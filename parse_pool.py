@@ -0,0 +1,105 @@
+"""
+Process pool for the CPU-bound HTML -> sections stage.
+
+selectolax parsing, the section walk and whitespace cleanup hold the GIL
+and block the event loop for every concurrent request. In pool mode,
+Scraper hands the HTML bytes of a page to a worker process and gets back
+the sections, parse statistics and noise filter counters as one JSON payload.
+Trees never cross the process boundary.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import multiprocessing
+import os
+
+from noise_filter import DEFAULT_DENY_RULES, NoiseFilter, NoiseRule
+
+# Per-process scraper used by parse_sections_worker(), built by the initializer
+_worker_scraper = None
+
+
+def _init_worker(deny: Sequence[NoiseRule], allow: Sequence[NoiseRule]):
+    global _worker_scraper
+    from scraper import Scraper
+    _worker_scraper = Scraper(noise_filter=NoiseFilter(deny, allow))
+
+
+def parse_sections_worker(html: bytes, base_url: str, options: Dict[str, Any],
+                          first_index: int = 0) -> bytes:
+    """
+    Parse UTF-8 HTML into sections inside a worker process. Returns JSON with
+    sections, parse stats and this document's noise filter counters.
+    """
+    from scraper import ParsedDocument, ScrapeOptions
+    if _worker_scraper is None:
+        _init_worker(DEFAULT_DENY_RULES, ())
+    noise_filter = _worker_scraper.noise_filter
+    hits_before = dict(noise_filter.hits)
+    allowed_before = dict(noise_filter.allowed)
+    stats: Dict[str, Any] = {}
+    sections = _worker_scraper._parse_sections(
+        ParsedDocument(html.decode("utf-8")), base_url, ScrapeOptions(**options), stats,
+        first_index=first_index,
+    )
+    noise = {
+        "hits": {label: count - hits_before[label] for label, count in noise_filter.hits.items()},
+        "allowed": {label: count - allowed_before[label] for label, count in noise_filter.allowed.items()},
+    }
+    return json.dumps({"sections": sections, "stats": stats, "noise": noise}).encode("utf-8")
+
+
+class ParsePool:
+    """
+    ProcessPoolExecutor running parse_sections_worker(), sized to the number
+    of cores by default. Worker noise filter counters are folded back into
+    noise_filter so /stats stays accurate.
+    """
+
+    def __init__(self, workers: int = 0, noise_filter: Optional[NoiseFilter] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.noise_filter = noise_filter or NoiseFilter()
+        # spawn: forking a process that runs an event loop and sqlite threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.noise_filter.deny, self.noise_filter.allow),
+        )
+        self.tasks = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def parse(self, html: str, base_url: str, options,
+                    first_index: int = 0) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Sections and parse stats of html, computed in a worker process."""
+        payload = html.encode("utf-8")
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            raw = await loop.run_in_executor(
+                self._executor, parse_sections_worker, payload, base_url, asdict(options), first_index
+            )
+        finally:
+            self.in_flight -= 1
+        self.tasks += 1
+        self.bytes_in += len(payload)
+        self.bytes_out += len(raw)
+        result = json.loads(raw)
+        self.noise_filter.record(result["noise"]["hits"], result["noise"]["allowed"])
+        return result["sections"], result["stats"]
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "tasks": self.tasks,
+            "inFlight": self.in_flight,
+            "bytesIn": self.bytes_in,
+            "bytesOut": self.bytes_out,
+        }
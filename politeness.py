@@ -0,0 +1,298 @@
+"""
+Per-host politeness for outgoing page requests.
+
+ScrapeScheduler bounds whole scrapes. PolitenessScheduler sits under
+Scraper and paces the individual static fetches and browser navigations
+sent to each host:
+
+- a token bucket per host (rate and burst);
+- a cap on in-flight requests per host;
+- robots.txt, fetched once per origin and cached. Its Crawl-delay lowers the
+  host's rate, and Disallow rules are optionally enforced;
+- Retry-After on 429/503 responses, which pauses the host until it expires.
+
+Queue wait time per host is recorded for /stats.
+"""
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import asyncio
+import time
+
+import httpx
+
+from static_fetch import FetchError
+
+RETRY_AFTER_STATUSES = frozenset((429, 503))
+# Real robots.txt files are a few KiB; anything past this is not one
+MAX_ROBOTS_BYTES = 512 * 1024
+
+
+class RobotsDisallowedError(FetchError):
+    def __init__(self, url: str):
+        super().__init__(f"Disallowed by robots.txt: {url}")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RobotsCache:
+    """
+    robots.txt per origin, fetched with the shared client and cached for ttl
+    seconds. Unreachable, missing or oversized (beyond max_bytes) files allow
+    everything.
+    """
+
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None, ttl: float = 3600.0,
+                 max_entries: int = 1024, user_agent: str = "*", timeout: float = 10.0,
+                 max_bytes: int = MAX_ROBOTS_BYTES):
+        self.http_client = http_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        # origin -> (parser or None for allow-all, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.fetches = 0
+        self.failures = 0
+        self.oversized = 0
+
+    async def get(self, url: str) -> Optional[RobotFileParser]:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        entry = self._entries.get(origin)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(origin)
+            return entry[0]
+        # Concurrent requests for one origin share a single fetch. It runs in
+        # its own task, so a caller that is cancelled (deadline, disconnect)
+        # only stops waiting and the others still get the result
+        task = self._pending.get(origin)
+        if task is None:
+            task = self._pending[origin] = asyncio.create_task(self._load(origin))
+            # Mark an error retrieved in case every caller was cancelled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task)
+
+    async def _load(self, origin: str) -> Optional[RobotFileParser]:
+        try:
+            robots = await self._fetch(origin)
+        finally:
+            del self._pending[origin]
+        self._entries[origin] = (robots, time.monotonic() + self.ttl)
+        self._entries.move_to_end(origin)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return robots
+
+    async def _fetch(self, origin: str) -> Optional[RobotFileParser]:
+        self.fetches += 1
+        try:
+            if self.http_client is not None:
+                text = await self._read(self.http_client, origin, timeout=self.timeout)
+            else:
+                async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+                    text = await self._read(client, origin)
+        except httpx.HTTPError:
+            self.failures += 1
+            return None
+        if text is None:
+            return None
+        robots = RobotFileParser(origin + "/robots.txt")
+        robots.parse(text.splitlines())
+        return robots
+
+    async def _read(self, client: httpx.AsyncClient, origin: str, **kwargs) -> Optional[str]:
+        """Body of origin's robots.txt; None when it is missing or over max_bytes."""
+        async with client.stream("GET", origin + "/robots.txt", **kwargs) as response:
+            if response.status_code != 200:
+                return None
+            declared = response.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                self.oversized += 1
+                return None
+            body = bytearray()
+            # Decompressed bytes, so a small gzip bomb is cut off too
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > self.max_bytes:
+                    self.oversized += 1
+                    return None
+        # robots.txt is UTF-8 (RFC 9309)
+        return body.decode("utf-8", errors="replace")
+
+    def crawl_delay(self, robots: Optional[RobotFileParser]) -> Optional[float]:
+        if robots is None:
+            return None
+        delay = robots.crawl_delay(self.user_agent)
+        rate = robots.request_rate(self.user_agent)
+        if rate is not None and rate.requests:
+            delay = max(float(delay or 0), rate.seconds / rate.requests)
+        return float(delay) if delay else None
+
+    def allowed(self, robots: Optional[RobotFileParser], url: str) -> bool:
+        return robots is None or robots.can_fetch(self.user_agent, url)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cached": len(self._entries), "fetches": self.fetches, "failures": self.failures,
+                "oversized": self.oversized}
+
+
+class HostState:
+    """Token bucket, concurrency slots and wait metrics for one host."""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.crawl_delay: Optional[float] = None
+        self.lock = asyncio.Lock()
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.users = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.throttled = 0
+
+    def apply_crawl_delay(self, delay: Optional[float]):
+        """Crawl-delay caps the rate at one request per delay, without bursts."""
+        if delay and delay != self.crawl_delay:
+            self.crawl_delay = delay
+            self.rate = min(self.rate, 1.0 / delay)
+            self.burst = 1
+            self.tokens = min(self.tokens, 1.0)
+
+    async def take_token(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if self.blocked_until > now:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "inFlight": self.in_flight,
+            "waiting": self.users - self.in_flight,
+            "waitMsAvg": round(self.wait_total / self.requests * 1000, 1) if self.requests else 0.0,
+            "waitMsMax": round(self.wait_max * 1000, 1),
+            "ratePerSecond": round(self.rate, 3),
+            "crawlDelay": self.crawl_delay,
+            "throttled": self.throttled,
+            "blockedForSeconds": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+        }
+
+
+class PolitenessScheduler:
+    """Paces requests per host; wrap every page request in slot(url)."""
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, max_per_host: int = 2,
+                 robots: Optional[RobotsCache] = None, obey_robots: bool = False,
+                 max_retry_after: float = 300.0, max_hosts: int = 10000):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_per_host = max(1, max_per_host)
+        self.robots = robots
+        self.obey_robots = obey_robots
+        self.max_retry_after = max_retry_after
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+        self.disallowed = 0
+
+    def _host(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.rate, self.burst, self.max_per_host)
+            # Forget the least recently used idle hosts
+            for name in list(self._hosts):
+                if len(self._hosts) <= self.max_hosts:
+                    break
+                if self._hosts[name].users == 0 and name != host:
+                    del self._hosts[name]
+        self._hosts.move_to_end(host)
+        return state
+
+    async def check(self, url: str):
+        """Load robots.txt for url's origin; raise if it disallows url and obey_robots is set."""
+        if self.robots is None:
+            return
+        robots = await self.robots.get(url)
+        self._host(urlparse(url).netloc.lower()).apply_crawl_delay(self.robots.crawl_delay(robots))
+        if self.obey_robots and not self.robots.allowed(robots, url):
+            self.disallowed += 1
+            raise RobotsDisallowedError(url)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Wait for a concurrency slot and a token for url's host, then hold the slot."""
+        await self.check(url)
+        state = self._host(urlparse(url).netloc.lower())
+        state.users += 1
+        start = time.monotonic()
+        try:
+            async with state.slots:
+                await state.take_token()
+                waited = time.monotonic() - start
+                state.requests += 1
+                state.wait_total += waited
+                state.wait_max = max(state.wait_max, waited)
+                state.in_flight += 1
+                try:
+                    yield
+                finally:
+                    state.in_flight -= 1
+        finally:
+            state.users -= 1
+
+    def observe(self, url: str, status: int, headers: Mapping[str, str]):
+        """Pause the host when a 429/503 response carries Retry-After."""
+        if status not in RETRY_AFTER_STATUSES:
+            return
+        state = self._host(urlparse(url).netloc.lower())
+        state.throttled += 1
+        delay = parse_retry_after(headers.get("retry-after"))
+        if delay is None:
+            # No hint: back off for one interval at the host's rate
+            delay = 1.0 / state.rate
+        delay = min(delay, self.max_retry_after)
+        state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ratePerSecond": self.rate,
+            "burst": self.burst,
+            "maxPerHost": self.max_per_host,
+            "obeyRobots": self.obey_robots,
+            "disallowed": self.disallowed,
+            "robots": self.robots.stats() if self.robots is not None else None,
+            "hosts": {host: state.stats() for host, state in self._hosts.items()},
+        }
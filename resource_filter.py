@@ -0,0 +1,104 @@
+"""
+Request-scoped sub-resource blocking for Playwright pages.
+
+Extraction only reads the DOM, so images, fonts, media and analytics
+beacons are aborted before they are fetched.
+"""
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Route
+
+DEFAULT_BLOCKED_TYPES = ("image", "font", "media")
+
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "criteo.com",
+    "adnxs.com",
+    "taboola.com",
+    "outbrain.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "intercom.io",
+)
+
+
+class ResourceFilter:
+    """
+    page.route handler that aborts requests by resource type or domain and
+    counts what it blocked. One instance covers all pages of one scrape.
+    """
+
+    def __init__(self, block_types: Optional[Iterable[str]] = None,
+                 block_domains: Optional[Iterable[str]] = None,
+                 allow_domains: Optional[Iterable[str]] = None):
+        self.block_types = frozenset(DEFAULT_BLOCKED_TYPES if block_types is None else block_types)
+        self.block_domains = tuple(d.lower().lstrip(".") for d in
+                                   (DEFAULT_BLOCKED_DOMAINS if block_domains is None else block_domains))
+        self.allow_domains = tuple(d.lower().lstrip(".") for d in (allow_domains or ()))
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.blocked_by_domain = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.block_types or self.block_domains)
+
+    async def install(self, page: Page):
+        """Route every request of page through the filter."""
+        if self.enabled:
+            await page.route("**/*", self._handle)
+
+    async def _handle(self, route: Route):
+        request = route.request
+        reason = self._block_reason(request.resource_type, request.url)
+        if reason is None:
+            self.allowed += 1
+            await route.continue_()
+            return
+        self.blocked += 1
+        if reason == "domain":
+            self.blocked_by_domain += 1
+        else:
+            self.blocked_by_type[reason] = self.blocked_by_type.get(reason, 0) + 1
+        await route.abort("blockedbyclient")
+
+    def _block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Resource type or "domain" when the request should be blocked."""
+        host = (urlparse(url).hostname or "").lower()
+        if host and _matches_domain(host, self.allow_domains):
+            return None
+        if host and _matches_domain(host, self.block_domains):
+            return "domain"
+        if resource_type in self.block_types:
+            return resource_type
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blockedByType": dict(self.blocked_by_type),
+            "blockedByDomain": self.blocked_by_domain,
+        }
+
+
+def _matches_domain(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
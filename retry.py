@@ -0,0 +1,128 @@
+"""
+Retries with backoff for static fetches, and classification of fetch failures.
+"""
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple, Type, TypeVar
+import asyncio
+import random
+import time
+
+import httpx
+
+from politeness import parse_retry_after
+from static_fetch import FetchError
+
+T = TypeVar("T")
+
+DEFAULT_RETRY_STATUSES = frozenset((408, 425, 429, 500, 502, 503, 504))
+DEFAULT_RETRY_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    asyncio.TimeoutError,  # the per-attempt fetch cap
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+BLOCKED_STATUSES = frozenset((401, 403))
+
+# Failure classes; only the ones in FALLBACK_FAILURES are worth a browser render
+TRANSIENT = "transient"  # retryable, retries exhausted
+BLOCKED = "blocked"  # 401/403, often bot protection that a real browser passes
+CLIENT = "client"  # other 4xx, e.g. 404: the browser would get the same answer
+SERVER = "server"  # non-retryable 5xx
+REFUSED = "refused"  # oversized, non-HTML or disallowed: never fetched in full
+CONTENT = "content"  # anything else, e.g. undecodable or malformed responses
+FALLBACK_FAILURES = frozenset((BLOCKED, CONTENT))
+
+
+class RetriesExhaustedError(Exception):
+    """A retryable failure persisted through every attempt or the deadline."""
+
+    def __init__(self, last_error: BaseException, attempts: int):
+        super().__init__(f"{last_error} (gave up after {attempts} attempt{'s' if attempts != 1 else ''})")
+        self.last_error = last_error
+        self.attempts = attempts
+
+
+def classify_failure(error: BaseException) -> str:
+    """Failure class of a static fetch exception."""
+    if isinstance(error, RetriesExhaustedError):
+        return TRANSIENT
+    if isinstance(error, FetchError):
+        return REFUSED
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status in BLOCKED_STATUSES:
+            return BLOCKED
+        return SERVER if status >= 500 else CLIENT
+    if isinstance(error, DEFAULT_RETRY_EXCEPTIONS):
+        return TRANSIENT
+    return CONTENT
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n sleeps a uniform random
+    time up to min(max_delay, base_delay * multiplier ** (n - 1)), or longer
+    when the server sent Retry-After. No attempt starts past the deadline.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0,
+                 multiplier: float = 2.0, deadline: float = 10.0,
+                 retry_statuses: FrozenSet[int] = DEFAULT_RETRY_STATUSES,
+                 retry_exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRY_EXCEPTIONS,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self._rng = rng or random.Random()
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return self._rng.uniform(0, ceiling)
+
+    def _retry_hint(self, error: BaseException) -> Tuple[bool, Optional[float]]:
+        """Whether error is retryable, and the server's Retry-After if it sent one."""
+        if isinstance(error, httpx.HTTPStatusError):
+            response = error.response
+            if response.status_code not in self.retry_statuses:
+                return False, None
+            return True, parse_retry_after(response.headers.get("retry-after"))
+        return isinstance(error, self.retry_exceptions), None
+
+    async def call(self, fn: Callable[[], Awaitable[T]], deadline: Optional[float] = None) -> T:
+        """
+        Await fn() until it succeeds, fails permanently, or runs out of
+        attempts or time. deadline (seconds) overrides the policy's for this call.
+        """
+        budget = self.deadline if deadline is None else deadline
+        start = time.monotonic()
+        self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await fn()
+            except Exception as e:
+                retryable, hint = self._retry_hint(e)
+                if not retryable:
+                    raise
+                delay = max(self.backoff(attempt), hint or 0.0)
+                if attempt >= self.max_attempts or time.monotonic() - start + delay > budget:
+                    self.exhausted += 1
+                    raise RetriesExhaustedError(e, attempt) from e
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxAttempts": self.max_attempts,
+            "deadline": self.deadline,
+            "calls": self.calls,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
@@ -0,0 +1,63 @@
+"""
+Per-URL HTTP validators (ETag / Last-Modified) and the sections parsed
+from the matching response, so unchanged pages can be revalidated with a
+conditional request instead of being downloaded and parsed again.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import json
+
+
+@dataclass
+class RevalidationEntry:
+    """Validators and extracted content for one URL/options combination."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    meta: Dict[str, Any]
+    sections_json: str  # Serialized so callers can never mutate the stored copy
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def sections(self) -> List[Dict[str, Any]]:
+        return json.loads(self.sections_json)
+
+
+class RevalidationStore:
+    """LRU of RevalidationEntry objects bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, RevalidationEntry]" = OrderedDict()
+        self.revalidated = 0
+
+    def get(self, key: str) -> Optional[RevalidationEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, validators: Dict[str, str], meta: Dict[str, Any],
+            sections: List[Dict[str, Any]]):
+        """Remember validators and content; responses without validators are ignored."""
+        etag = validators.get("etag")
+        last_modified = validators.get("last-modified")
+        if not etag and not last_modified:
+            return
+        self._entries[key] = RevalidationEntry(etag, last_modified, meta, json.dumps(sections))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "revalidated": self.revalidated}
@@ -0,0 +1,66 @@
+"""
+Shared scheduler bounding scrape concurrency globally and per host.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar
+from urllib.parse import urlparse
+import asyncio
+
+T = TypeVar("T")
+
+
+class ScrapeScheduler:
+    """
+    Runs scrapes under a global semaphore and one semaphore per host, so a
+    batch cannot monopolise the browser pool or hammer a single site.
+    """
+
+    def __init__(self, max_concurrency: int = 10, max_per_host: int = 2):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_host = max(1, max_per_host)
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+        self.active = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a per-host and a global slot for the duration of one scrape."""
+        host = urlparse(url).netloc.lower()
+        host_semaphore = self._hosts.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        self.waiting += 1
+        try:
+            # Take the host slot first so waiters on a busy host do not hold global slots
+            async with host_semaphore:
+                async with self._global:
+                    self.waiting -= 1
+                    self.active += 1
+                    try:
+                        yield
+                    finally:
+                        self.active -= 1
+                        self.waiting += 1
+        finally:
+            self.waiting -= 1
+            self._host_users[host] -= 1
+            if self._host_users[host] == 0:
+                del self._host_users[host]
+                del self._hosts[host]
+
+    async def run(self, url: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Run factory() once slots for url are available."""
+        async with self.slot(url):
+            return await factory()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "maxPerHost": self.max_per_host,
+            "active": self.active,
+            "waiting": self.waiting,
+            "hosts": len(self._hosts),
+        }
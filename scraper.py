@@ -4,17 +4,153 @@ Core scraping logic with static and JS rendering support.
 import httpx
 from selectolax.parser import HTMLParser
 from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator, Tuple
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from urllib.parse import urljoin, urlparse
 import re
 import asyncio
+import json
+
+from browser_pool import BrowserPool
+from deadline import Deadline, DeadlineExceeded
+from dedup import SimHashIndex, format_fingerprint, simhash
+from html_serializer import serialize_truncated
+from noise_filter import NoiseFilter
+from pagination import PaginationPlan, find_next_url, plan_pagination
+from parse_pool import ParsePool
+from politeness import PolitenessScheduler
+from retry import FALLBACK_FAILURES, REFUSED, RetryPolicy, classify_failure
+from resource_filter import ResourceFilter
+from section_walker import SectionContent, walk_section
+from static_fetch import DEFAULT_MAX_RESPONSE_BYTES, FetchError, fetch_html
+from revalidation import RevalidationStore
+from urls import normalize_url
+from waits import WaitEngine
+
+
+SCRAPE_MODES = ("static", "auto", "interactive")
+RAW_HTML_BUDGET = 2000
+# Section ids of pagination page k start at k * MAX_SECTIONS_PER_PAGE
+MAX_SECTIONS_PER_PAGE = 20
+# Pages visited when following pagination, including the first
+MAX_PAGINATION_PAGES = 3
+TAB_SELECTOR = '[role="tab"], .tab, [data-tab]'
+MAX_TABS = 3
+
+
+@dataclass
+class ScrapeOptions:
+    """Per-request knobs controlling how a URL is scraped."""
+
+    # static: never launch a browser
+    # auto: use the browser only for thin pages or pages with interactive elements
+    # interactive: always render and run click/scroll/pagination flows
+    mode: str = "auto"
+    # Optional CSS selector to wait for after navigation
+    wait_for: Optional[str] = None
+    # Browser sub-resource blocking; None uses the defaults, [] disables
+    block_resource_types: Optional[List[str]] = None
+    block_domains: Optional[List[str]] = None
+    allow_domains: Optional[List[str]] = None
+    # Assign each node's content only to its innermost section (nested landmarks)
+    dedupe_landmarks: bool = False
+    # rawHtml per section: off entirely, only for the listed section ids, and
+    # its size budget in characters (serialization stops once it is reached)
+    include_raw_html: bool = True
+    raw_html_sections: Optional[List[str]] = None
+    raw_html_budget: int = RAW_HTML_BUDGET
+    # Near-duplicate sections (by SimHash of their text): None ignores them,
+    # "flag" marks them with nearDuplicateOf and "skip" leaves them out
+    near_duplicates: Optional[str] = None
+    # Click each tab in its own page of the browser context, concurrently,
+    # instead of one after another on a single page
+    parallel_tabs: bool = False
+    # Add "links": every a[href] of the page, resolved, before noise filtering
+    # and section limits (crawls follow these rather than section links)
+    collect_links: bool = False
+
+
+@dataclass
+class FetchedPage:
+    """Everything gathered about a page before it is split into sections."""
+
+    url: str
+    scraped_at: str
+    doc: "ParsedDocument"
+    meta: Dict[str, Any]
+    interactions: Dict[str, Any]
+    errors: List[Dict[str, str]]
+    # ETag/Last-Modified of the static response, when its HTML is the final content
+    validators: Optional[Dict[str, str]] = None
+    # Sections reused from a previous scrape after a 304 Not Modified
+    sections: Optional[List[Dict[str, Any]]] = None
+    revalidated: bool = False
+    # Counts requests blocked in every browser page opened for this scrape
+    resources: Optional[ResourceFilter] = None
+    # Earlier pagination pages: (url, task parsing the HTML captured before leaving it)
+    paginated: List[Tuple[str, "asyncio.Task"]] = field(default_factory=list)
+    # Later pagination pages fetched statically: (url, task fetching and parsing them)
+    following: List[Tuple[str, "asyncio.Task"]] = field(default_factory=list)
+    # DOM snapshots of tabs clicked in parallel pages: (url, task parsing them)
+    tab_snapshots: List[Tuple[str, "asyncio.Task"]] = field(default_factory=list)
+
+    @property
+    def source_url(self) -> str:
+        """URL of the page whose HTML is in doc: the last page the browser visited."""
+        return self.interactions["pages"][len(self.paginated)]
+
+
+class ParsedDocument:
+    """
+    An HTML payload parsed once and shared by the fallback heuristic, meta
+    extraction, noise filtering and section extraction.
+
+    Noise filtering decomposes nodes in place, so section parsing must be
+    the last consumer of the tree.
+    """
+
+    def __init__(self, html: str):
+        self.html = html
+        self._tree: Optional[HTMLParser] = None
+        self._body_text: Optional[str] = None
+
+    @property
+    def tree(self) -> HTMLParser:
+        """selectolax tree, parsed on first use (pool mode may never need it here)."""
+        if self._tree is None:
+            self._tree = HTMLParser(self.html)
+        return self._tree
+
+    @property
+    def body_text(self) -> str:
+        """Text of <body>, computed on first use."""
+        if self._body_text is None:
+            body = self.tree.body
+            self._body_text = body.text() if body else ""
+        return self._body_text
 
 
 class Scraper:
     """Main scraper class handling static and JS-rendered content."""
     
-    def __init__(self):
+    def __init__(self, browser_pool: Optional[BrowserPool] = None,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 revalidation_store: Optional[RevalidationStore] = None,
+                 noise_filter: Optional[NoiseFilter] = None,
+                 max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+                 parse_pool: Optional[ParsePool] = None,
+                 politeness: Optional[PolitenessScheduler] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        self.browser_pool = browser_pool
+        self.http_client = http_client
+        self.revalidation_store = revalidation_store
+        self.noise_filter = noise_filter or NoiseFilter()
+        self.max_response_bytes = max_response_bytes
+        self.parse_pool = parse_pool
+        self.politeness = politeness
+        self.retry_policy = retry_policy or RetryPolicy()
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         self.playwright = None
@@ -40,64 +176,516 @@ class Scraper:
             self.playwright = await async_playwright().start()
             self.browser = await self.playwright.chromium.launch(headless=True)
         return self.browser
+
+    @asynccontextmanager
+    async def _new_page(self, resources: Optional[ResourceFilter] = None) -> AsyncIterator[Page]:
+        """Open a page in an isolated context, from the shared pool when available."""
+        if self.browser_pool is not None:
+            async with self.browser_pool.context() as context:
+                page = await context.new_page()
+                try:
+                    if resources is not None:
+                        await resources.install(page)
+                    yield page
+                finally:
+                    await page.close()
+        else:
+            browser = await self.get_browser()
+            page = await browser.new_page()
+            try:
+                if resources is not None:
+                    await resources.install(page)
+                yield page
+            finally:
+                await page.close()
         
-    async def scrape(self, url: str) -> Dict[str, Any]:
+    async def scrape(self, url: str, options: Optional[ScrapeOptions] = None,
+                     deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
-        Main scraping method with static-first, JS-fallback strategy.
+        Main scraping method with static-first, JS-fallback strategy. Every
+        phase gets the time remaining on deadline.
         """
-        errors = []
-        scraped_at = datetime.now(timezone.utc).isoformat()
-        interactions = {
-            "clicks": [],
-            "scrolls": 0,
-            "pages": [url]
-        }
+        options = options or ScrapeOptions()
+        deadline = deadline or Deadline()
+        page = await self._fetch(url, options, deadline)
         
-        # Try static scraping first
+        # Parse sections, unless a 304 let us reuse the previous ones
+        sections = page.sections
+        parse_stats: Dict[str, Any] = {}
+        # Read before parsing: noise filtering edits the tree
+        links = self._document_links(page.doc, page.source_url) if options.collect_links else None
+        if sections is None:
+            try:
+                sections = await self._captured_sections(page, page.paginated, deadline)
+                sections.extend(await self._sections(page, url, options, parse_stats, deadline))
+                sections.extend(await self._captured_sections(page, page.following, deadline))
+                sections.extend(self._unseen_sections(
+                    sections, await self._captured_sections(page, page.tab_snapshots, deadline)
+                ))
+            finally:
+                self._cancel_captured(page)
+            self._note_parse_deadline(page, deadline)
+            self._remember_validators(page, options, sections)
+        
+        result = {
+            "url": url,
+            "scrapedAt": page.scraped_at,
+            "meta": page.meta,
+            "sections": sections,
+            "interactions": page.interactions,
+            "errors": page.errors,
+            "revalidated": page.revalidated,
+            "resources": page.resources.stats(),
+            "parseStats": parse_stats
+        }
+        if links is not None:
+            result["links"] = links
+        return result
+    
+    async def scrape_stream(self, url: str, options: Optional[ScrapeOptions] = None,
+                            deadline: Optional[Deadline] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Same as scrape(), but yields the result piece by piece: meta first,
+        then each section as it is extracted, then interactions and errors.
+        """
+        options = options or ScrapeOptions()
+        deadline = deadline or Deadline()
+        page = await self._fetch(url, options, deadline)
         try:
-            html, meta = await self._static_scrape(url)
-            
-            # Heuristic: if we got very little text content, try JS rendering
-            parser = HTMLParser(html)
-            text_content = parser.body.text() if parser.body else ""
-            
-            # If less than 200 chars of text or no main content sections, try JS
-            if len(text_content.strip()) < 200 or not self._has_main_content(html):
-                html, meta, js_errors, js_interactions = await self._js_scrape(url)
-                errors.extend(js_errors)
-                interactions.update(js_interactions)
+            yield {"type": "meta", "url": url, "scrapedAt": page.scraped_at, "meta": page.meta,
+                   "revalidated": page.revalidated}
+            parse_stats: Dict[str, Any] = {}
+            if page.sections is not None:
+                for section in page.sections:
+                    yield {"type": "section", "section": section}
             else:
-                # Still try JS for interactions (clicks, scrolls)
-                html, meta, js_errors, js_interactions = await self._js_scrape_for_interactions(url)
-                errors.extend(js_errors)
-                interactions.update(js_interactions)
+                # Sections are only kept when they can be revalidated later, or
+                # to drop tab snapshot sections that repeat them
+                kept = [] if page.validators or page.tab_snapshots else None
+                try:
+                    for section in await self._captured_sections(page, page.paginated, deadline):
+                        if kept is not None:
+                            kept.append(section)
+                        yield {"type": "section", "section": section}
+                    for section in await self._sections(page, url, options, parse_stats, deadline):
+                        if kept is not None:
+                            kept.append(section)
+                        yield {"type": "section", "section": section}
+                    for section in await self._captured_sections(page, page.following, deadline):
+                        yield {"type": "section", "section": section}
+                    if page.tab_snapshots:
+                        tab_sections = await self._captured_sections(page, page.tab_snapshots, deadline)
+                        for section in self._unseen_sections(kept, tab_sections):
+                            yield {"type": "section", "section": section}
+                    self._note_parse_deadline(page, deadline)
+                    if kept is not None:
+                        self._remember_validators(page, options, kept)
+                except Exception as e:
+                    page.errors.append({"message": f"Section parsing failed: {str(e)}", "phase": "parse"})
+            yield {"type": "interactions", "interactions": page.interactions,
+                   "resources": page.resources.stats(), "parseStats": parse_stats}
+            yield {"type": "errors", "errors": page.errors}
+        finally:
+            # Also reached when the client disconnects mid-stream
+            self._cancel_captured(page)
+    
+    async def _sections(self, page: FetchedPage, url: str, options: ScrapeOptions,
+                        parse_stats: Dict[str, Any], deadline: Deadline) -> Iterator[Dict[str, Any]]:
+        """
+        Sections of the fetched page, parsed in-process or in the parse pool.
+        After pagination, this is the last page visited; its ids follow the
+        earlier pages'.
+        """
+        base_url = page.source_url
+        first_index = len(page.paginated) * MAX_SECTIONS_PER_PAGE
+        if self.parse_pool is None:
+            return self._iter_sections(page.doc, base_url, options, parse_stats, deadline, first_index)
+        try:
+            # The worker returns all sections at once
+            pooled, stats = await deadline.run(
+                self.parse_pool.parse(page.doc.html, base_url, options, first_index), "parse"
+            )
+        except DeadlineExceeded:
+            return iter(())
+        parse_stats.update(stats)
+        return iter(pooled)
+    
+    async def _parse_off_loop(self, doc: ParsedDocument, source_url: str, options: Optional[ScrapeOptions],
+                              deadline: Deadline, first_index: int) -> List[Dict[str, Any]]:
+        """Sections of a pagination page, parsed in the parse pool or a worker thread."""
+        if self.parse_pool is not None:
+            sections, _ = await self.parse_pool.parse(doc.html, source_url, options, first_index)
+            return sections
+        # The shared noise filter's counters are not thread-safe: filter with a
+        # copy of its rules, as parse pool workers do, and fold the counts back
+        noise_filter = NoiseFilter(self.noise_filter.deny, self.noise_filter.allow)
+        sections = await asyncio.to_thread(
+            Scraper(noise_filter=noise_filter)._parse_sections,
+            doc, source_url, options, None, deadline, first_index,
+        )
+        if noise_filter.documents:
+            self.noise_filter.record(noise_filter.hits, noise_filter.allowed)
+        return sections
+    
+    def _parse_in_background(self, html: str, source_url: str, options: Optional[ScrapeOptions],
+                             deadline: Deadline, first_index: int) -> "asyncio.Task":
+        """Start parsing a captured pagination page off the event loop."""
+        return asyncio.create_task(
+            self._parse_off_loop(ParsedDocument(html), source_url, options, deadline, first_index)
+        )
+    
+    async def _captured_sections(self, page: FetchedPage, captured: List[Tuple[str, "asyncio.Task"]],
+                                 deadline: Deadline) -> List[Dict[str, Any]]:
+        """Sections of other pagination pages (page.paginated or page.following), in page order."""
+        if not captured:
+            return []
+        tasks = [task for _, task in captured]
+        try:
+            await deadline.run(asyncio.gather(*tasks, return_exceptions=True), "parse")
+        except DeadlineExceeded:
+            # Stop pages still being parsed and let them finish unwinding
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        sections: List[Dict[str, Any]] = []
+        for source_url, task in captured:
+            if task.cancelled():
+                continue
+            if task.exception() is not None:
+                page.errors.append({"message": f"Section parsing failed for {source_url}: {task.exception()}",
+                                    "phase": "parse"})
+                continue
+            sections.extend(task.result())
+        return sections
+    
+    @staticmethod
+    def _cancel_captured(page: FetchedPage):
+        """Cancel background page fetches and parses the parse phase did not wait for."""
+        for _, task in page.paginated + page.following + page.tab_snapshots:
+            if not task.done():
+                task.cancel()
+    
+    def _note_parse_deadline(self, page: FetchedPage, deadline: Deadline):
+        if deadline.exceeded_in == "parse":
+            page.errors.append({"message": "Deadline exceeded during parse; remaining sections were skipped",
+                                "phase": "parse"})
+    
+    def _unseen_sections(self, sections: List[Dict[str, Any]],
+                         candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        candidates whose text does not nearly repeat a section in sections or
+        an earlier candidate. Tab snapshots share most of the page, so only
+        the panels they revealed survive.
+        """
+        if not candidates:
+            return []
+        index = SimHashIndex()
+        for section in sections:
+            fingerprint = simhash(section["content"]["text"])
+            if fingerprint is not None:
+                index.add(fingerprint, section["id"])
+        unseen = []
+        for section in candidates:
+            fingerprint = simhash(section["content"]["text"])
+            if fingerprint is not None and index.check(fingerprint, section["id"]) is None:
+                unseen.append(section)
+        return unseen
+    
+    async def _fetch(self, url: str, options: ScrapeOptions,
+                     deadline: Optional[Deadline] = None) -> FetchedPage:
+        """Fetch and, if needed, render the page according to the scrape mode."""
+        deadline = deadline or Deadline()
+        if options.mode not in SCRAPE_MODES:
+            raise ValueError(f"Unknown scrape mode: {options.mode}")
+        page = FetchedPage(
+            url=url,
+            scraped_at=datetime.now(timezone.utc).isoformat(),
+            doc=ParsedDocument(""),
+            meta=self._default_meta(),
+            interactions={
+                "clicks": [],
+                "scrolls": 0,
+                "pages": [url]
+            },
+            errors=[],
+            resources=ResourceFilter(
+                block_types=options.block_resource_types,
+                block_domains=options.block_domains,
+                allow_domains=options.allow_domains,
+            ),
+        )
+        
+        if self.politeness is not None:
+            try:
+                # Loads robots.txt (Crawl-delay) and enforces Disallow when configured
+                await deadline.run(self.politeness.check(url), "fetch")
+            except (FetchError, DeadlineExceeded) as e:
+                page.errors.append({"message": str(e), "phase": "fetch"})
+                return page
+        
+        if options.mode == "interactive":
+            # Skip the static fetch entirely; the browser result replaces it anyway
+            try:
+                html, meta, js_errors, js_interactions = await self._js_scrape_for_interactions(
+                    url, options, page.resources, deadline, page.paginated, page.tab_snapshots
+                )
+                page.errors.extend(js_errors)
+                page.interactions.update(js_interactions)
+                page.doc, page.meta = ParsedDocument(html), meta
+            except Exception as e:
+                page.errors.append({"message": f"JS scrape failed: {str(e)}", "phase": "render"})
+        else:
+            await self._static_first(page, options, deadline)
+        
+        return page
+    
+    async def _static_first(self, page: FetchedPage, options: ScrapeOptions, deadline: Deadline):
+        """Static fetch, escalating to the browser only when the mode and page call for it."""
+        url = page.url
+        errors = page.errors
+        interactions = page.interactions
+        key = self._revalidation_key(url, options)
+        entry = self.revalidation_store.get(key) if self.revalidation_store else None
+        conditional = entry.conditional_headers() if entry else None
+        try:
+            doc, meta, validators = await self.retry_policy.call(
+                lambda: self._static_scrape(url, conditional, deadline),
+                deadline=deadline.remaining(self.retry_policy.deadline),
+            )
+        except DeadlineExceeded as e:
+            errors.append({"message": str(e), "phase": "fetch"})
+            return
         except Exception as e:
-            errors.append({"message": f"Static scrape failed: {str(e)}", "phase": "fetch"})
+            failure = classify_failure(e)
+            if failure == REFUSED:
+                # Oversized, non-HTML or disallowed: the browser would load the same body
+                errors.append({"message": str(e), "phase": "fetch"})
+                return
+            errors.append({"message": f"Static scrape failed ({failure}): {str(e)}", "phase": "fetch"})
+            # Only blocks and content failures may succeed in a real browser
+            if options.mode == "static" or failure not in FALLBACK_FAILURES:
+                return
             # Fallback to JS
             try:
-                html, meta, js_errors, js_interactions = await self._js_scrape(url)
+                html, meta, js_errors, js_interactions = await self._js_scrape(url, options, page.resources, deadline)
                 errors.extend(js_errors)
                 interactions.update(js_interactions)
+                page.doc, page.meta = ParsedDocument(html), meta
             except Exception as e2:
                 errors.append({"message": f"JS scrape failed: {str(e2)}", "phase": "render"})
-                html = ""
-                meta = self._extract_meta_static("")
+            return
         
-        # Parse sections
-        sections = self._parse_sections(html, url)
+        if doc is None:
+            if entry is None:
+                errors.append({"message": "Unexpected 304 Not Modified without a stored copy", "phase": "fetch"})
+                return
+            # 304 Not Modified: the stored sections are still current
+            self.revalidation_store.revalidated += 1
+            page.meta = entry.meta
+            page.sections = entry.sections()
+            page.revalidated = True
+            return
         
-        return {
-            "url": url,
-            "scrapedAt": scraped_at,
-            "meta": meta,
-            "sections": sections,
-            "interactions": interactions,
-            "errors": errors
-        }
+        page.doc, page.meta = doc, meta
+        if options.mode == "static":
+            page.validators = validators
+            return
+        
+        # Heuristic: if we got very little text content, try JS rendering
+        text_content = doc.body_text
+        
+        try:
+            # If less than 200 chars of text or no main content sections, try JS
+            if len(text_content.strip()) < 200 or not self._has_main_content(doc):
+                html, meta, js_errors, js_interactions = await self._js_scrape(url, options, page.resources, deadline)
+            elif self._has_interactive_elements(doc):
+                plan = None if self._has_click_targets(doc) else plan_pagination(
+                    doc.tree, url, MAX_PAGINATION_PAGES
+                )
+                if plan is not None:
+                    # Pagination through plain links: later pages need no browser
+                    self._follow_statically(page, plan, options, deadline)
+                    return
+                # Tabs, load-more buttons or script-driven pagination need the browser
+                html, meta, js_errors, js_interactions = await self._js_scrape_for_interactions(
+                    url, options, page.resources, deadline, page.paginated, page.tab_snapshots
+                )
+            else:
+                # Static content is sufficient; no browser needed
+                page.validators = validators
+                return
+        except Exception as e:
+            errors.append({"message": f"JS scrape failed: {str(e)}", "phase": "render"})
+            return
+        if self.revalidation_store is not None:
+            # Browser content cannot be revalidated with the static validators
+            self.revalidation_store.discard(key)
+        errors.extend(js_errors)
+        interactions.update(js_interactions)
+        page.doc, page.meta = ParsedDocument(html), meta
+    
+    def _revalidation_key(self, url: str, options: ScrapeOptions) -> str:
+        return normalize_url(url) + "|" + json.dumps(asdict(options), sort_keys=True)
+    
+    def _remember_validators(self, page: FetchedPage, options: ScrapeOptions,
+                             sections: List[Dict[str, Any]]):
+        """Store validators and sections of a static-only result for later 304s."""
+        if self.revalidation_store is None or not page.validators or page.errors:
+            return
+        self.revalidation_store.put(self._revalidation_key(page.url, options), page.validators,
+                                    page.meta, sections)
+    
+    def _has_interactive_elements(self, doc: ParsedDocument) -> bool:
+        """Detect tabs, load-more buttons or pagination links in static HTML."""
+        parser = doc.tree
+        if parser.css_first('[role="tab"], .tab, [data-tab], [rel="next"], '
+                            '[class*="load-more"], [class*="show-more"]'):
+            return True
+        for elem in parser.css("button, a"):
+            text = elem.text().strip().lower()
+            if text.startswith(("load more", "show more")) or text == "next":
+                return True
+        return False
+    
+    def _has_click_targets(self, doc: ParsedDocument) -> bool:
+        """Detect tabs or load-more buttons, which only a browser can operate."""
+        parser = doc.tree
+        if parser.css_first('[role="tab"], .tab, [data-tab], [class*="load-more"], [class*="show-more"]'):
+            return True
+        for elem in parser.css("button, a"):
+            if elem.text().strip().lower().startswith(("load more", "show more")):
+                return True
+        return False
+    
+    def _follow_statically(self, page: FetchedPage, plan: PaginationPlan, options: ScrapeOptions,
+                           deadline: Deadline):
+        """
+        Start fetching the planned later pages through the static path:
+        predicted URLs all at once, otherwise one next link after another.
+        """
+        if plan.predicted:
+            page.following.append((plan.urls[0], asyncio.create_task(
+                self._follow_predicted(page, plan.urls, options, deadline)
+            )))
+        else:
+            page.following.append((plan.urls[0], asyncio.create_task(
+                self._follow_next_links(page, plan.urls[0], options, deadline)
+            )))
+    
+    async def _fetch_pagination_page(self, url: str, deadline: Deadline) -> Optional[ParsedDocument]:
+        """Static fetch of a pagination page; None if it does not exist (past the last page)."""
+        try:
+            doc, _, _ = await self.retry_policy.call(
+                lambda: self._static_scrape(url, None, deadline),
+                deadline=deadline.remaining(self.retry_policy.deadline),
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 410):
+                return None
+            raise
+        return doc
     
-    def _has_main_content(self, html: str) -> bool:
+    async def _predicted_page(self, url: str, options: ScrapeOptions, deadline: Deadline,
+                              number: int) -> Optional[Tuple[Optional[str], List[Dict[str, Any]]]]:
+        """
+        (next link, sections) of predicted pagination page number (the first
+        page is 0); None if it does not exist (predicted past the last page).
+        """
+        doc = await self._fetch_pagination_page(url, deadline)
+        if doc is None:
+            return None
+        # Read the next link before parsing: noise filtering edits the tree
+        next_url = find_next_url(doc.tree, url)
+        return next_url, await self._parse_off_loop(doc, url, options, deadline, number * MAX_SECTIONS_PER_PAGE)
+    
+    async def _follow_predicted(self, page: FetchedPage, urls: List[str], options: ScrapeOptions,
+                                deadline: Deadline) -> List[Dict[str, Any]]:
+        """
+        Sections of the predicted pages, fetched all at once. Page N is kept
+        only while page N-1 linked to it, so a counter that only looked like
+        pagination stops at the first page that disagrees.
+        """
+        pages = page.interactions["pages"]
+        pages.extend(urls)
+        tasks = [
+            asyncio.create_task(self._predicted_page(url, options, deadline, number))
+            for number, url in enumerate(urls, 1)
+        ]
+        sections: List[Dict[str, Any]] = []
+        kept = 0
+        try:
+            for index, (url, task) in enumerate(zip(urls, tasks)):
+                try:
+                    fetched = await task
+                except Exception as e:
+                    # The chain cannot be confirmed past a page that failed
+                    page.errors.append({"message": f"Static fetch of page {url} failed: {str(e)}", "phase": "fetch"})
+                    kept += 1
+                    break
+                if fetched is None:
+                    break
+                next_url, page_sections = fetched
+                sections.extend(page_sections)
+                kept += 1
+                following = urls[index + 1] if index + 1 < len(urls) else None
+                if following is not None and (next_url is None or normalize_url(next_url) != normalize_url(following)):
+                    break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for url in urls[kept:]:
+                pages.remove(url)
+        return sections
+    
+    async def _follow_next_links(self, page: FetchedPage, url: str, options: ScrapeOptions,
+                                 deadline: Deadline) -> List[Dict[str, Any]]:
+        """Sections of the pages reached by following next links statically from url."""
+        pages = page.interactions["pages"]
+        sections: List[Dict[str, Any]] = []
+        number = 1
+        while url and number < MAX_PAGINATION_PAGES and url not in pages:
+            pages.append(url)
+            try:
+                doc = await self._fetch_pagination_page(url, deadline)
+            except Exception as e:
+                page.errors.append({"message": f"Static fetch of page {url} failed: {str(e)}", "phase": "fetch"})
+                break
+            if doc is None:
+                pages.remove(url)
+                break
+            # Read the next link before parsing: noise filtering edits the tree
+            next_url = find_next_url(doc.tree, url)
+            sections.extend(await self._parse_off_loop(doc, url, options, deadline,
+                                                       number * MAX_SECTIONS_PER_PAGE))
+            url, number = next_url, number + 1
+        return sections
+    
+    @staticmethod
+    def _document_links(doc: Optional[ParsedDocument], base_url: str) -> Optional[List[str]]:
+        """
+        Absolute URLs of every a[href] in the document, deduplicated in
+        document order, resolved against <base href> or base_url. None when
+        there is no document (a 304 reused the previous sections).
+        """
+        if doc is None or not doc.html:
+            return None
+        base = doc.tree.css_first("base[href]")
+        if base is not None:
+            base_url = urljoin(base_url, base.attributes.get("href") or "")
+        links: Dict[str, None] = {}
+        for anchor in doc.tree.css("a[href]"):
+            href = (anchor.attributes.get("href") or "").strip()
+            if not href or href.startswith("#") or href.lower().startswith(("javascript:", "mailto:", "tel:")):
+                continue
+            links[urljoin(base_url, href).split("#", 1)[0]] = None
+        return list(links)
+    
+    def _has_main_content(self, doc: ParsedDocument) -> bool:
         """Check if HTML has substantial main content."""
-        parser = HTMLParser(html)
+        parser = doc.tree
         main = parser.css_first("main")
         if main:
             return len(main.text().strip()) > 100
@@ -107,156 +695,334 @@ class Scraper:
             return len(article.text().strip()) > 100
         return False
     
-    async def _static_scrape(self, url: str) -> tuple[str, Dict[str, str]]:
-        """Static scraping using httpx."""
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            html = response.text
-            meta = self._extract_meta_static(html)
-            return html, meta
+    async def _static_scrape(self, url: str, headers: Optional[Dict[str, str]] = None,
+                             deadline: Optional[Deadline] = None
+                             ) -> tuple[Optional[ParsedDocument], Dict[str, str], Dict[str, str]]:
+        """
+        Static scraping using httpx, on the shared client when one was injected.
+        Returns the document, its meta and the response validators; the document
+        is None when a conditional request was answered with 304 Not Modified.
+        The body is streamed and capped at max_response_bytes. The politeness
+        wait and the download together get at most 30s or the time left.
+        """
+        async def fetch():
+            async with self._polite(url):
+                try:
+                    if self.http_client is not None:
+                        return await fetch_html(self.http_client, url, headers, self.max_response_bytes)
+                    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+                        return await fetch_html(client, url, headers, self.max_response_bytes)
+                except httpx.HTTPStatusError as e:
+                    if self.politeness is not None:
+                        self.politeness.observe(url, e.response.status_code, e.response.headers)
+                    raise
+        
+        response = await (deadline or Deadline()).run(fetch(), "fetch", cap=30.0)
+        validators = {
+            name: response.headers[name]
+            for name in ("etag", "last-modified")
+            if name in response.headers
+        }
+        if response.html is None:
+            return None, {}, validators
+        doc = ParsedDocument(response.html)
+        meta = self._extract_meta_static(doc)
+        return doc, meta, validators
     
-    async def _js_scrape(self, url: str) -> tuple[str, Dict[str, str], List[Dict[str, str]], Dict[str, Any]]:
+    async def _js_scrape(self, url: str, options: Optional[ScrapeOptions] = None,
+                         resources: Optional[ResourceFilter] = None,
+                         deadline: Optional[Deadline] = None) -> tuple[str, Dict[str, str], List[Dict[str, str]], Dict[str, Any]]:
         """JS rendering using Playwright."""
+        deadline = deadline or Deadline()
         errors = []
         interactions = {
             "clicks": [],
             "scrolls": 0,
             "pages": [url]
         }
-        browser = await self.get_browser()
-        page = await browser.new_page()
-        
-        try:
-            # Navigate and wait
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            await asyncio.sleep(2)  # Additional wait for dynamic content
-            
-            # Extract HTML and meta
-            html = await page.content()
-            meta = await self._extract_meta_js(page)
-            
-            await page.close()
-            return html, meta, errors, interactions
-        except PlaywrightTimeoutError as e:
-            errors.append({"message": f"Timeout waiting for page load: {str(e)}", "phase": "render"})
-            html = await page.content()
-            meta = await self._extract_meta_js(page)
-            await page.close()
-            return html, meta, errors, interactions
-        except Exception as e:
-            errors.append({"message": f"JS rendering error: {str(e)}", "phase": "render"})
+        async with self._new_page(resources) as page:
+            waits = WaitEngine(page)
             try:
+                # Navigate and wait
+                await self._goto(page, url, deadline)
+                await self._settle_after_load(waits, options, deadline)
+                
+                # Extract HTML and meta
+                html = await page.content()
+                meta = await self._extract_meta_js(page)
+                
+                return html, meta, errors, interactions
+            except PlaywrightTimeoutError as e:
+                errors.append({"message": f"Timeout waiting for page load: {str(e)}", "phase": "render"})
                 html = await page.content()
                 meta = await self._extract_meta_js(page)
-            except:
-                html = ""
-                meta = self._extract_meta_static("")
-            await page.close()
-            return html, meta, errors, interactions
-    
-    async def _js_scrape_for_interactions(self, url: str) -> tuple[str, Dict[str, str], List[Dict[str, str]], Dict[str, Any]]:
-        """JS scraping with interactions (clicks, scrolls, pagination)."""
+                return html, meta, errors, interactions
+            except Exception as e:
+                errors.append({"message": f"JS rendering error: {str(e)}", "phase": "render"})
+                try:
+                    html = await page.content()
+                    meta = await self._extract_meta_js(page)
+                except:
+                    html = ""
+                    meta = self._default_meta()
+                return html, meta, errors, interactions
+    
+    @asynccontextmanager
+    async def _polite(self, url: str) -> AsyncIterator[None]:
+        """Hold a politeness slot for url's host, when a scheduler is configured."""
+        if self.politeness is None:
+            yield
+            return
+        async with self.politeness.slot(url):
+            yield
+    
+    async def _goto(self, page: Page, url: str, deadline: Deadline):
+        """Navigate under the politeness scheduler, honouring Retry-After and the deadline."""
+        async def navigate():
+            async with self._polite(url):
+                try:
+                    response = await page.goto(url, wait_until="networkidle",
+                                               timeout=deadline.timeout_ms(30.0))
+                except PlaywrightTimeoutError:
+                    if deadline.expired:
+                        raise deadline.exceeded("render")
+                    raise
+                if response is not None and self.politeness is not None:
+                    self.politeness.observe(url, response.status, response.headers)
+                return response
+        
+        # The cap also bounds the politeness wait before navigation starts
+        return await deadline.run(navigate(), "render", cap=30.0)
+    
+    async def _settle(self, waits: WaitEngine, deadline: Deadline, ceiling: float, **kwargs):
+        """waits.settle() with its ceiling cut to the time left."""
+        ceiling = deadline.remaining(ceiling)
+        if ceiling > 0:
+            await waits.settle(ceiling=ceiling, **kwargs)
+    
+    def _out_of_time(self, deadline: Deadline, errors: List[Dict[str, str]]) -> bool:
+        """Whether interactions must stop; reports it once."""
+        if not deadline.expired:
+            return False
+        if deadline.exceeded_in is None:
+            deadline.exceeded("interactions")
+            errors.append({"message": "Deadline exceeded during interactions; returning the page as it is",
+                           "phase": "render"})
+        return True
+    
+    async def _settle_after_load(self, waits: WaitEngine, options: Optional[ScrapeOptions],
+                                 deadline: Deadline):
+        """Wait for dynamic content after navigation instead of sleeping a fixed 2s."""
+        if options and options.wait_for:
+            timeout = deadline.remaining(10.0)
+            if timeout <= 0 or not await waits.selector(options.wait_for, timeout=timeout):
+                return
+        await self._settle(waits, deadline, 2.0)
+    
+    async def _js_scrape_for_interactions(self, url: str, options: Optional[ScrapeOptions] = None,
+                                          resources: Optional[ResourceFilter] = None,
+                                          deadline: Optional[Deadline] = None,
+                                          paginated: Optional[List[Tuple[str, "asyncio.Task"]]] = None,
+                                          tab_snapshots: Optional[List[Tuple[str, "asyncio.Task"]]] = None) -> tuple[str, Dict[str, str], List[Dict[str, str]], Dict[str, Any]]:
+        """
+        JS scraping with interactions (clicks, scrolls, pagination). Steps stop
+        once the deadline passes and the page is returned as it is. Before
+        following a "Next" link, the current page's HTML is captured and a
+        background parse of it is appended to paginated. With parallel_tabs,
+        parses of the other tabs' snapshots are appended to tab_snapshots.
+        """
+        deadline = deadline or Deadline()
+        paginated = paginated if paginated is not None else []
+        tab_snapshots = tab_snapshots if tab_snapshots is not None else []
         errors = []
-        browser = await self.get_browser()
-        page = await browser.new_page()
         
         clicks = []
         scrolls = 0
         pages_visited = [url]
         
-        try:
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            await asyncio.sleep(2)
+        async with self._new_page(resources) as page:
+            waits = WaitEngine(page)
+            try:
+                await self._goto(page, url, deadline)
+                await self._settle_after_load(waits, options, deadline)
             
-            # Try clicking tabs
-            tabs = await page.query_selector_all('[role="tab"], .tab, [data-tab]')
-            for tab in tabs[:3]:  # Limit to 3 tabs
-                try:
-                    await tab.click(timeout=5000)
-                    await asyncio.sleep(1)
-                    clicks.append('[role="tab"]')
-                except:
-                    pass
+                # Try clicking tabs
+                tabs = await page.query_selector_all(TAB_SELECTOR)
+                if options and options.parallel_tabs and len(tabs) > 1 and not deadline.expired:
+                    clicked = await self._click_tabs_in_parallel(
+                        page, waits, url, min(len(tabs), MAX_TABS), options, resources, deadline,
+                        errors, tab_snapshots
+                    )
+                    clicks.extend(['[role="tab"]'] * clicked)
+                    tabs = []
+                for tab in tabs[:MAX_TABS]:  # Limit to 3 tabs
+                    if self._out_of_time(deadline, errors):
+                        break
+                    try:
+                        await tab.click(timeout=deadline.timeout_ms(5.0))
+                        await self._settle(waits, deadline, 1.0)
+                        clicks.append('[role="tab"]')
+                    except:
+                        pass
             
-            # Try clicking "Load more" / "Show more" buttons
-            load_more_selectors = [
-                'button:has-text("Load more")',
-                'button:has-text("Show more")',
-                'button:has-text("Load More")',
-                'a:has-text("Load more")',
-                '[class*="load-more"]',
-                '[class*="show-more"]'
-            ]
+                # Try clicking "Load more" / "Show more" buttons
+                load_more_selectors = [
+                    'button:has-text("Load more")',
+                    'button:has-text("Show more")',
+                    'button:has-text("Load More")',
+                    'a:has-text("Load more")',
+                    '[class*="load-more"]',
+                    '[class*="show-more"]'
+                ]
             
-            for selector in load_more_selectors:
-                try:
-                    button = await page.query_selector(selector)
-                    if button:
-                        await button.click(timeout=5000)
-                        await asyncio.sleep(2)
-                        clicks.append(selector)
+                for selector in load_more_selectors:
+                    if self._out_of_time(deadline, errors):
                         break
-                except:
-                    pass
-            
-            # Scroll and pagination to depth ≥ 3
-            for i in range(3):
-                # Scroll down
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await asyncio.sleep(1.5)
-                scrolls += 1
-                
-                # Check for pagination links
-                next_links = await page.query_selector_all('a:has-text("Next"), a:has-text("next"), [rel="next"]')
-                if next_links and i < 2:  # Don't go beyond depth 3
                     try:
-                        next_url = await next_links[0].get_attribute("href")
-                        if next_url:
-                            full_url = urljoin(url, next_url)
-                            if full_url not in pages_visited:
-                                pages_visited.append(full_url)
-                                await page.goto(full_url, wait_until="networkidle", timeout=30000)
-                                await asyncio.sleep(2)
+                        button = await page.query_selector(selector)
+                        if button:
+                            await button.click(timeout=deadline.timeout_ms(5.0))
+                            await self._settle(waits, deadline, 2.0)
+                            clicks.append(selector)
+                            break
                     except:
                         pass
             
-            html = await page.content()
-            meta = await self._extract_meta_js(page)
-            
-            interactions = {
-                "clicks": clicks,
-                "scrolls": scrolls,
-                "pages": pages_visited
-            }
+                # Scroll and pagination to depth ≥ 3
+                for i in range(3):
+                    if self._out_of_time(deadline, errors):
+                        break
+                    # Scroll down
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    await self._settle(waits, deadline, 1.5, scroll=True)
+                    scrolls += 1
+                
+                    # Check for pagination links
+                    next_links = await page.query_selector_all('a:has-text("Next"), a:has-text("next"), [rel="next"]')
+                    if next_links and i < MAX_PAGINATION_PAGES - 1:  # Don't go beyond depth 3
+                        try:
+                            next_url = await next_links[0].get_attribute("href")
+                            if next_url:
+                                full_url = urljoin(url, next_url)
+                                if full_url not in pages_visited:
+                                    # Parse the page being left while the browser moves on
+                                    paginated.append((pages_visited[-1], self._parse_in_background(
+                                        await page.content(), pages_visited[-1], options, deadline,
+                                        len(paginated) * MAX_SECTIONS_PER_PAGE,
+                                    )))
+                                    pages_visited.append(full_url)
+                                    await self._goto(page, full_url, deadline)
+                                    await self._settle(waits, deadline, 2.0)
+                        except:
+                            pass
             
-            await page.close()
-            return html, meta, errors, interactions
-        except Exception as e:
-            errors.append({"message": f"Interaction error: {str(e)}", "phase": "render"})
-            try:
                 html = await page.content()
                 meta = await self._extract_meta_js(page)
-            except:
-                html = ""
-                meta = self._extract_meta_static("")
-            interactions = {
-                "clicks": clicks,
-                "scrolls": scrolls,
-                "pages": pages_visited
-            }
-            await page.close()
-            return html, meta, errors, interactions
+            
+                interactions = {
+                    "clicks": clicks,
+                    "scrolls": scrolls,
+                    "pages": pages_visited
+                }
+            
+                return html, meta, errors, interactions
+            except Exception as e:
+                errors.append({"message": f"Interaction error: {str(e)}", "phase": "render"})
+                try:
+                    html = await page.content()
+                    meta = await self._extract_meta_js(page)
+                except:
+                    html = ""
+                    meta = self._default_meta()
+                interactions = {
+                    "clicks": clicks,
+                    "scrolls": scrolls,
+                    "pages": pages_visited
+                }
+                return html, meta, errors, interactions
     
-    def _extract_meta_static(self, html: str) -> Dict[str, str]:
-        """Extract meta information from static HTML."""
-        parser = HTMLParser(html)
-        meta = {
+    @asynccontextmanager
+    async def _sibling_page(self, page: Page, resources: Optional[ResourceFilter] = None) -> AsyncIterator[Page]:
+        """Another page in page's browser context, sharing its cookies and cache."""
+        if self.browser_pool is not None:
+            sibling = await page.context.new_page()
+        else:
+            # Pages from browser.new_page() own their context and cannot share it
+            browser = await self.get_browser()
+            sibling = await browser.new_page()
+        try:
+            if resources is not None:
+                await resources.install(sibling)
+            yield sibling
+        finally:
+            await sibling.close()
+    
+    async def _click_tab(self, page: Page, waits: WaitEngine, index: int, deadline: Deadline) -> bool:
+        """Click the index-th tab on page and let its panel settle."""
+        tabs = await page.query_selector_all(TAB_SELECTOR)
+        if index >= len(tabs):
+            return False
+        await tabs[index].click(timeout=deadline.timeout_ms(5.0))
+        await self._settle(waits, deadline, 1.0)
+        return True
+    
+    async def _snapshot_tab(self, page: Page, url: str, index: int, options: Optional[ScrapeOptions],
+                            resources: Optional[ResourceFilter], deadline: Deadline) -> Optional[str]:
+        """Load url in a sibling page, click tab index there and return the resulting DOM."""
+        async with self._sibling_page(page, resources) as sibling:
+            waits = WaitEngine(sibling)
+            await self._goto(sibling, url, deadline)
+            await self._settle_after_load(waits, options, deadline)
+            if not await self._click_tab(sibling, waits, index, deadline):
+                return None
+            return await sibling.content()
+    
+    async def _click_tabs_in_parallel(self, page: Page, waits: WaitEngine, url: str, count: int,
+                                      options: ScrapeOptions, resources: Optional[ResourceFilter],
+                                      deadline: Deadline, errors: List[Dict[str, str]],
+                                      tab_snapshots: List[Tuple[str, "asyncio.Task"]]) -> int:
+        """
+        Click the first tab on page while sibling pages each load url and click
+        one of the other tabs, so the wait is that of the slowest tab. Each
+        snapshot is parsed in the background. Returns the number of tabs clicked.
+        """
+        async def first_tab() -> bool:
+            try:
+                return await self._click_tab(page, waits, 0, deadline)
+            except Exception:
+                return False
+        
+        results = await asyncio.gather(
+            first_tab(),
+            *(self._snapshot_tab(page, url, index, options, resources, deadline) for index in range(1, count)),
+            return_exceptions=True,
+        )
+        clicked = 1 if results[0] is True else 0
+        for index, html in enumerate(results[1:], 1):
+            if isinstance(html, BaseException):
+                errors.append({"message": f"Tab {index} snapshot failed: {str(html)}", "phase": "render"})
+                continue
+            if html is None:
+                continue
+            clicked += 1
+            # Numbered after any pagination pages so ids stay unique
+            first_index = (MAX_PAGINATION_PAGES + index - 1) * MAX_SECTIONS_PER_PAGE
+            tab_snapshots.append((url, self._parse_in_background(html, url, options, deadline, first_index)))
+        return clicked
+    
+    def _default_meta(self) -> Dict[str, str]:
+        """Meta values used when nothing could be extracted."""
+        return {
             "title": "",
             "description": "",
             "language": "en",
             "canonical": None
         }
+    
+    def _extract_meta_static(self, doc: ParsedDocument) -> Dict[str, str]:
+        """Extract meta information from static HTML."""
+        parser = doc.tree
+        meta = self._default_meta()
         
         # Title
         title_tag = parser.css_first("title")
@@ -290,12 +1056,7 @@ class Scraper:
     
     async def _extract_meta_js(self, page: Page) -> Dict[str, str]:
         """Extract meta information using Playwright."""
-        meta = {
-            "title": "",
-            "description": "",
-            "language": "en",
-            "canonical": None
-        }
+        meta = self._default_meta()
         
         try:
             meta["title"] = await page.title() or ""
@@ -325,12 +1086,29 @@ class Scraper:
         
         return meta
     
-    def _parse_sections(self, html: str, base_url: str) -> List[Dict[str, Any]]:
+    def _parse_sections(self, doc: ParsedDocument, base_url: str,
+                        options: Optional[ScrapeOptions] = None,
+                        stats: Optional[Dict[str, Any]] = None,
+                        deadline: Optional[Deadline] = None,
+                        first_index: int = 0) -> List[Dict[str, Any]]:
         """Parse HTML into sections."""
-        if not html or not html.strip():
+        return list(self._iter_sections(doc, base_url, options, stats, deadline, first_index))
+    
+    def _iter_sections(self, doc: ParsedDocument, base_url: str,
+                       options: Optional[ScrapeOptions] = None,
+                       stats: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None,
+                       first_index: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield sections one at a time as they are extracted. Parse statistics
+        (e.g. landmark dedup savings) are written into stats once done. Stops
+        between sections once deadline has passed. Section ids are numbered
+        from first_index.
+        """
+        if not doc.html or not doc.html.strip():
             # Return a minimal section if HTML is empty
-            return [{
-                "id": "empty-0",
+            yield {
+                "id": f"empty-{first_index}",
                 "type": "unknown",
                 "label": "Empty Content",
                 "sourceUrl": base_url,
@@ -344,27 +1122,16 @@ class Scraper:
                 },
                 "rawHtml": "",
                 "truncated": False
-            }]
+            }
+            return
         
-        parser = HTMLParser(html)
-        sections = []
+        parser = doc.tree
+        emitted = 0
         
         # Filter out noise
-        noise_selectors = [
-            '[class*="cookie"]',
-            '[class*="banner"]',
-            '[class*="modal"]',
-            '[class*="popup"]',
-            '[class*="overlay"]',
-            '[id*="cookie"]',
-            '[id*="banner"]',
-            '[id*="modal"]',
-            '[id*="popup"]'
-        ]
-        
-        for selector in noise_selectors:
-            for elem in parser.css(selector):
-                elem.decompose()
+        removed = self.noise_filter.apply(parser)
+        if stats is not None:
+            stats["noiseRemoved"] = removed
         
         # Group by landmarks and headings
         section_elements = []
@@ -387,110 +1154,172 @@ class Scraper:
             if body:
                 section_elements.append(body)
         
+        selected = section_elements[:MAX_SECTIONS_PER_PAGE]  # Limit to 20 sections
+        
+        # Ownership mode: each selected element owns its subtree minus nested selected elements
+        owners: Optional[Dict[int, str]] = None
+        if options is not None and options.dedupe_landmarks:
+            owners = {}
+            for idx, elem in enumerate(selected, first_index):
+                owners.setdefault(elem.mem_id, f"{self._determine_type(elem.tag.lower(), elem)}-{idx}")
+        seen = set()
+        duplicates = SimHashIndex() if options is not None and options.near_duplicates else None
+        near_duplicates = 0
+        section_bytes: Dict[int, int] = {}
+        nested: Dict[int, List[int]] = {}
+        
         # Process each section
-        for idx, elem in enumerate(section_elements[:20]):  # Limit to 20 sections
-            section = self._extract_section(elem, base_url, idx)
+        for idx, elem in enumerate(selected, first_index):
+            if deadline is not None and deadline.expired:
+                deadline.exceeded("parse")
+                break
+            if owners is not None:
+                # The heading fallback can select the same parent more than once
+                if elem.mem_id in seen:
+                    continue
+                seen.add(elem.mem_id)
+            section = self._extract_section(elem, base_url, idx, owners, options, duplicates)
+            if section and section.get("nearDuplicateOf"):
+                near_duplicates += 1
+                if options.near_duplicates == "skip":
+                    continue
             if section:
-                sections.append(section)
+                if owners is not None:
+                    section_bytes[elem.mem_id] = len(json.dumps(section).encode("utf-8"))
+                    parent_id = self._owning_section(elem, owners)
+                    if parent_id is not None:
+                        nested.setdefault(parent_id, []).append(elem.mem_id)
+                emitted += 1
+                yield section
+        
+        if owners is not None and stats is not None:
+            stats["dedupBytesSaved"] = self._dedup_savings(selected, section_bytes, nested)
+        if duplicates is not None and stats is not None:
+            stats["nearDuplicates"] = near_duplicates
         
         # Ensure at least one section
-        if not sections:
+        if not emitted and not (deadline is not None and deadline.exceeded_in == "parse"):
             body = parser.body
             if body:
-                section = self._extract_section(body, base_url, 0)
+                section = self._extract_section(body, base_url, first_index, options=options)
                 if section:
-                    sections.append(section)
-        
-        return sections
+                    yield section
+    
+    def _owning_section(self, elem, owners: Dict[int, str]) -> Optional[int]:
+        """mem_id of the nearest enclosing selected section, if any."""
+        node = elem.parent
+        while node is not None:
+            if node.mem_id in owners:
+                return node.mem_id
+            node = node.parent
+        return None
+    
+    def _dedup_savings(self, selected, section_bytes: Dict[int, int],
+                       nested: Dict[int, List[int]]) -> int:
+        """
+        Estimated payload bytes saved by ownership mode: without it, every
+        section would also repeat the full content of the sections nested in it.
+        """
+        full: Dict[int, int] = {}
+        saved = 0
+        # Nested sections come later in document order, so walk backwards
+        for elem in reversed(selected):
+            mem_id = elem.mem_id
+            if mem_id not in section_bytes or mem_id in full:
+                continue
+            children = sum(full.get(child, 0) for child in nested.get(mem_id, ()))
+            full[mem_id] = section_bytes[mem_id] + children
+            saved += children
+        return saved
     
-    def _extract_section(self, elem, base_url: str, idx: int) -> Optional[Dict[str, Any]]:
-        """Extract content from a section element."""
+    def _extract_section(self, elem, base_url: str, idx: int,
+                         owners: Optional[Dict[int, str]] = None,
+                         options: Optional[ScrapeOptions] = None,
+                         duplicates: Optional[SimHashIndex] = None) -> Optional[Dict[str, Any]]:
+        """
+        Extract content from a section element. With owners (mem_id -> section
+        id of every selected section), nested sections are left out and
+        replaced by a reference in rawHtml. With duplicates, the section is
+        fingerprinted and, if it nearly repeats an earlier one, marked with
+        nearDuplicateOf and its rawHtml is not serialized.
+        """
         if not elem:
             return None
         
         # Determine type and label
         tag_name = elem.tag.lower() if hasattr(elem, 'tag') else 'div'
         section_type = self._determine_type(tag_name, elem)
-        label = self._derive_label(elem)
         
-        # Extract content
-        headings = []
-        for h in elem.css("h1, h2, h3, h4, h5, h6"):
-            heading_text = h.text().strip()
-            if heading_text:
-                headings.append(heading_text)
+        # Headings, text, links, images, lists and tables in one pass
+        skip_ids = frozenset(owners) - {elem.mem_id} if owners else frozenset()
+        content = walk_section(elem, skip_ids)
+        label = self._derive_label(elem, content)
+        
+        headings = content.heading_texts()
         
         # Text content
-        text = elem.text().strip()
+        text = content.text.strip()
         # Clean up text (remove excessive whitespace)
         text = re.sub(r'\s+', ' ', text)
         
-        # Links
-        links = []
-        for link in elem.css("a"):
-            href = link.attributes.get("href", "")
-            link_text = link.text().strip()
-            if href:
-                absolute_url = urljoin(base_url, href)
-                links.append({"text": link_text, "href": absolute_url})
+        # Links (only the ones kept are resolved)
+        links = [
+            {"text": link_text, "href": urljoin(base_url, href)}
+            for href, link_text in content.links[:50]
+        ]
         
         # Images
-        images = []
-        for img in elem.css("img"):
-            src = img.attributes.get("src", "")
-            alt = img.attributes.get("alt", "")
-            if src:
-                absolute_url = urljoin(base_url, src)
-                images.append({"src": absolute_url, "alt": alt})
-        
-        # Lists
-        lists = []
-        for ul_ol in elem.css("ul, ol"):
-            list_items = []
-            for li in ul_ol.css("li"):
-                item_text = li.text().strip()
-                if item_text:
-                    list_items.append(item_text)
-            if list_items:
-                lists.append(list_items)
-        
-        # Tables
-        tables = []
-        for table in elem.css("table"):
-            table_data = []
-            for row in table.css("tr"):
-                row_data = []
-                for cell in row.css("td, th"):
-                    cell_text = cell.text().strip()
-                    row_data.append(cell_text)
-                if row_data:
-                    table_data.append(row_data)
-            if table_data:
-                tables.append(table_data)
-        
-        # Raw HTML (truncated)
-        raw_html = str(elem.html) if hasattr(elem, 'html') else str(elem)
+        images = [
+            {"src": urljoin(base_url, src), "alt": alt}
+            for src, alt in content.images[:20]
+        ]
+        
+        lists = content.list_items()
+        tables = content.table_rows()
+        
+        section_id = f"{section_type}-{idx}"
+        fingerprint: Optional[int] = None
+        duplicate_of: Optional[str] = None
+        if duplicates is not None:
+            fingerprint = simhash(text)
+            if fingerprint is not None:
+                duplicate_of = duplicates.check(fingerprint, section_id)
+        
+        # Raw HTML (truncated while serializing; nested sections become references)
+        raw_html: Optional[str] = None
         truncated = False
-        if len(raw_html) > 2000:
-            raw_html = raw_html[:2000] + "..."
-            truncated = True
+        if duplicate_of is None and self._wants_raw_html(section_id, options):
+            budget = options.raw_html_budget if options is not None else RAW_HTML_BUDGET
+            raw_html, truncated = serialize_truncated(elem, budget, owners)
         
-        return {
-            "id": f"{section_type}-{idx}",
+        section = {
+            "id": section_id,
             "type": section_type,
             "label": label,
             "sourceUrl": base_url,
             "content": {
                 "headings": headings[:10],  # Limit headings
                 "text": text[:5000] if len(text) > 5000 else text,  # Limit text
-                "links": links[:50],  # Limit links
-                "images": images[:20],  # Limit images
+                "links": links,  # Limited to 50 above
+                "images": images,  # Limited to 20 above
                 "lists": lists[:10],  # Limit lists
                 "tables": tables
             },
             "rawHtml": raw_html,
             "truncated": truncated
         }
+        if duplicates is not None:
+            section["fingerprint"] = format_fingerprint(fingerprint) if fingerprint is not None else None
+            if duplicate_of is not None:
+                section["nearDuplicateOf"] = duplicate_of
+        return section
+    
+    def _wants_raw_html(self, section_id: str, options: Optional[ScrapeOptions]) -> bool:
+        if options is None:
+            return True
+        if not options.include_raw_html:
+            return False
+        return options.raw_html_sections is None or section_id in options.raw_html_sections
     
     def _determine_type(self, tag_name: str, elem) -> str:
         """Determine section type."""
@@ -523,16 +1352,15 @@ class Scraper:
         else:
             return "section"
     
-    def _derive_label(self, elem) -> str:
+    def _derive_label(self, elem, content: SectionContent) -> str:
         """Derive a human-readable label for the section."""
         # Try to find a heading first
-        for h in elem.css("h1, h2, h3"):
-            label = h.text().strip()
-            if label:
-                return label[:50]  # Limit length
+        label = content.label_heading()
+        if label:
+            return label[:50]  # Limit length
         
         # Fallback: use first 5-7 words of text
-        text = elem.text().strip()
+        text = content.text.strip()
         words = text.split()[:7]
         if words:
             label = " ".join(words)
@@ -543,9 +1371,40 @@ class Scraper:
         return tag_name.capitalize()
 
 
-async def scrape_url(url: str) -> Dict[str, Any]:
+async def scrape_url(url: str, options: Optional[ScrapeOptions] = None,
+                     browser_pool: Optional[BrowserPool] = None,
+                     http_client: Optional[httpx.AsyncClient] = None,
+                     revalidation_store: Optional[RevalidationStore] = None,
+                     noise_filter: Optional[NoiseFilter] = None,
+                     max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+                     parse_pool: Optional[ParsePool] = None,
+                     politeness: Optional[PolitenessScheduler] = None,
+                     retry_policy: Optional[RetryPolicy] = None,
+                     deadline: Optional[Deadline] = None) -> Dict[str, Any]:
     """Main entry point for scraping a URL."""
-    async with Scraper() as scraper:
-        result = await scraper.scrape(url)
+    async with Scraper(browser_pool=browser_pool, http_client=http_client,
+                       revalidation_store=revalidation_store, noise_filter=noise_filter,
+                       max_response_bytes=max_response_bytes, parse_pool=parse_pool,
+                       politeness=politeness, retry_policy=retry_policy) as scraper:
+        result = await scraper.scrape(url, options, deadline)
         return result
 
+
+async def scrape_url_stream(url: str, options: Optional[ScrapeOptions] = None,
+                            browser_pool: Optional[BrowserPool] = None,
+                            http_client: Optional[httpx.AsyncClient] = None,
+                            revalidation_store: Optional[RevalidationStore] = None,
+                            noise_filter: Optional[NoiseFilter] = None,
+                            max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+                            parse_pool: Optional[ParsePool] = None,
+                            politeness: Optional[PolitenessScheduler] = None,
+                            retry_policy: Optional[RetryPolicy] = None,
+                            deadline: Optional[Deadline] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming entry point: yields meta, sections, interactions and errors events."""
+    async with Scraper(browser_pool=browser_pool, http_client=http_client,
+                       revalidation_store=revalidation_store, noise_filter=noise_filter,
+                       max_response_bytes=max_response_bytes, parse_pool=parse_pool,
+                       politeness=politeness, retry_policy=retry_policy) as scraper:
+        async for event in scraper.scrape_stream(url, options, deadline):
+            yield event
+
@@ -0,0 +1,196 @@
+"""
+Single-pass extraction of a section subtree's headings, text, links, images, lists and tables.
+"""
+from typing import AbstractSet, Any, List, Optional, Tuple
+
+# Selector lists, in the order css() returns their matches: every match of
+# the first selector (in document order), then every match of the next
+HEADING_ORDER = ("h1", "h2", "h3", "h4", "h5", "h6")
+LIST_ORDER = ("ul", "ol")
+CELL_ORDER = ("td", "th")
+
+HEADING_TAGS = frozenset(HEADING_ORDER)
+LABEL_HEADING_TAGS = frozenset(("h1", "h2", "h3"))
+LIST_TAGS = frozenset(LIST_ORDER)
+CELL_TAGS = frozenset(CELL_ORDER)
+
+_RANK = {tag: rank for order in (HEADING_ORDER, LIST_ORDER, CELL_ORDER) for rank, tag in enumerate(order)}
+
+
+def _selector_order(entries):
+    """entries ([tag, ...] in document order) in the order of a css() selector list."""
+    return sorted(entries, key=lambda entry: _RANK[entry[0]])
+
+TEXT_NODE = "-text"
+
+
+class SectionContent:
+    """Raw content collected from one section subtree."""
+
+    def __init__(self):
+        self.text_parts: List[str] = []
+        # [tag, text] per heading, in document order; text is filled on exit
+        self.headings: List[List[Optional[str]]] = []
+        # [href, text] per link with a non-empty href
+        self.links: List[List[Optional[str]]] = []
+        # (src, alt) per image with a non-empty src
+        self.images: List[Tuple[str, str]] = []
+        # (tag, item slots) per <ul>/<ol>, in document order
+        self.lists: List[Tuple[str, List[Optional[str]]]] = []
+        # Rows per <table>; each row is a list of [tag, text] cells
+        self.tables: List[List[List[List[Optional[str]]]]] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+    def heading_texts(self) -> List[str]:
+        return [text for _tag, text in _selector_order(self.headings) if text]
+
+    def label_heading(self) -> Optional[str]:
+        """First non-empty h1, else h2, else h3, as _derive_label() looks for."""
+        for tag, text in _selector_order(self.headings):
+            if tag in LABEL_HEADING_TAGS and text:
+                return text
+        return None
+
+    def list_items(self) -> List[List[str]]:
+        lists = []
+        for _tag, slots in _selector_order(self.lists):
+            items = [item for item in slots if item]
+            if items:
+                lists.append(items)
+        return lists
+
+    def table_rows(self) -> List[List[List[str]]]:
+        tables = []
+        for rows in self.tables:
+            table_data = [[text for _tag, text in _selector_order(row)] for row in rows if row]
+            if table_data:
+                tables.append(table_data)
+        return tables
+
+
+class SectionWalker:
+    """
+    Walks a selectolax subtree once, depth first, collecting SectionContent
+    that matches the per-field css() queries. The root element is matched
+    as well as its descendants. A <li> belongs to every enclosing <ul>/<ol>,
+    a <tr> to every enclosing <table> and a cell to every enclosing <tr>.
+    Descendants in skip_ids (other sections) are not entered.
+    """
+
+    def __init__(self, root, skip_ids: AbstractSet[int] = frozenset()):
+        self.root = root
+        self.skip_ids = skip_ids
+
+    def walk(self) -> SectionContent:
+        content = SectionContent()
+        open_buffers: List[List[str]] = []
+        open_lists: List[List[Optional[str]]] = []
+        open_tables: List[List[List[Optional[str]]]] = []
+        open_rows: List[List[List[Optional[str]]]] = []
+
+        # Entries are (node, None) on entry and (node, frame) on exit
+        stack: List[Tuple[Any, Optional[tuple]]] = [(self.root, None)]
+        while stack:
+            node, frame = stack.pop()
+
+            if frame is not None:
+                kind = frame[0]
+                if kind == "text":
+                    # Heading, link, list item or cell: write its stripped text to the reserved slots
+                    _, buffer, slots = frame
+                    open_buffers.pop()
+                    value = "".join(buffer).strip()
+                    for target, index in slots:
+                        target[index] = value
+                elif kind == "list":
+                    open_lists.pop()
+                elif kind == "table":
+                    open_tables.pop()
+                elif kind == "row":
+                    open_rows.pop()
+                continue
+
+            tag = node.tag
+            if tag == TEXT_NODE:
+                value = node.text(deep=False)
+                content.text_parts.append(value)
+                for buffer in open_buffers:
+                    buffer.append(value)
+                continue
+            if tag.startswith(("-", "_", "!")):
+                # Comments, doctype and other non-element nodes carry no content
+                continue
+            if self.skip_ids and node is not self.root and node.mem_id in self.skip_ids:
+                continue
+
+            frame = None
+            if tag in HEADING_TAGS:
+                entry = [tag, None]
+                content.headings.append(entry)
+                frame = self._text_frame(open_buffers, [(entry, 1)])
+            elif tag == "a":
+                href = node.attributes.get("href", "")
+                if href:
+                    entry = [href, None]
+                    content.links.append(entry)
+                    frame = self._text_frame(open_buffers, [(entry, 1)])
+            elif tag == "img":
+                src = node.attributes.get("src", "")
+                if src:
+                    content.images.append((src, node.attributes.get("alt", "")))
+            elif tag in LIST_TAGS:
+                slots: List[Optional[str]] = []
+                content.lists.append((tag, slots))
+                open_lists.append(slots)
+                frame = ("list",)
+            elif tag == "li":
+                if open_lists:
+                    targets = []
+                    for slots in open_lists:
+                        slots.append(None)
+                        targets.append((slots, len(slots) - 1))
+                    frame = self._text_frame(open_buffers, targets)
+            elif tag == "table":
+                rows: List[List[Optional[str]]] = []
+                content.tables.append(rows)
+                open_tables.append(rows)
+                frame = ("table",)
+            elif tag == "tr":
+                row: List[List[Optional[str]]] = []
+                for rows in open_tables:
+                    rows.append(row)
+                open_rows.append(row)
+                frame = ("row",)
+            elif tag in CELL_TAGS:
+                if open_rows:
+                    targets = []
+                    for row in open_rows:
+                        cell = [tag, None]
+                        row.append(cell)
+                        targets.append((cell, 1))
+                    frame = self._text_frame(open_buffers, targets)
+
+            if frame is not None:
+                stack.append((node, frame))
+            children = []
+            child = node.child
+            while child is not None:
+                children.append(child)
+                child = child.next
+            stack.extend((child, None) for child in reversed(children))
+
+        return content
+
+    @staticmethod
+    def _text_frame(open_buffers: List[List[str]], slots) -> tuple:
+        buffer: List[str] = []
+        open_buffers.append(buffer)
+        return ("text", buffer, slots)
+
+
+def walk_section(elem, skip_ids: AbstractSet[int] = frozenset()) -> SectionContent:
+    """Collect headings, links, images, lists, tables and text in one pass."""
+    return SectionWalker(elem, skip_ids).walk()
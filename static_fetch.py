@@ -0,0 +1,146 @@
+"""
+Bounded, streaming static fetch.
+
+The body is streamed rather than read with response.text. It is rejected up
+front when the Content-Type is not HTML or Content-Length exceeds the cap,
+and it is aborted as soon as the received bytes pass the cap. Bytes are
+decoded incrementally once the charset is known. As in browsers, the charset
+comes from a BOM, then the Content-Type header, then a <meta> declaration in
+the first kilobyte.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import codecs
+import re
+
+import httpx
+
+DEFAULT_MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Bytes inspected for a BOM or <meta charset> before decoding starts
+SNIFF_BYTES = 1024
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class FetchError(Exception):
+    """The static fetch was refused; a browser render would not help either."""
+
+
+class ContentTooLargeError(FetchError):
+    def __init__(self, url: str, limit: int, size: Optional[int] = None):
+        detail = f"{size} bytes" if size is not None else "body"
+        super().__init__(f"Response too large: {detail} exceeds the {limit} byte limit ({url})")
+        self.limit = limit
+        self.size = size
+
+
+class UnsupportedContentTypeError(FetchError):
+    def __init__(self, url: str, content_type: str):
+        super().__init__(f"Unsupported Content-Type {content_type!r}, expected HTML ({url})")
+        self.content_type = content_type
+
+
+@dataclass
+class StaticResponse:
+    """Outcome of a bounded fetch; html is None for 304 Not Modified."""
+
+    status_code: int
+    headers: httpx.Headers
+    html: Optional[str]
+    encoding: Optional[str] = None
+    bytes_read: int = 0
+
+
+def _header_charset(content_type: str) -> Optional[str]:
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            return value.strip().strip("\"'")
+    return None
+
+
+def _valid_encoding(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name if isinstance(name, str) else name.decode("ascii")).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def detect_encoding(content_type: str, head: bytes) -> str:
+    """Charset from a BOM, then the Content-Type header, then <meta>, else UTF-8."""
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            return name
+    encoding = _valid_encoding(_header_charset(content_type))
+    if encoding:
+        return encoding
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        encoding = _valid_encoding(match.group(1))
+        if encoding:
+            return encoding
+    return "utf-8"
+
+
+def _is_html(content_type: str) -> bool:
+    # A missing Content-Type is sniffed by the parser like a browser would
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return not media_type or media_type in HTML_CONTENT_TYPES
+
+
+async def fetch_html(client: httpx.AsyncClient, url: str,
+                     headers: Optional[Dict[str, str]] = None,
+                     max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES) -> StaticResponse:
+    """
+    GET url and decode its HTML body, reading at most max_bytes (0 disables
+    the cap). Raises httpx.HTTPStatusError for error statuses and FetchError
+    subclasses for oversized or non-HTML responses.
+    """
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 304:
+            return StaticResponse(response.status_code, response.headers, None)
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "")
+        if not _is_html(content_type):
+            raise UnsupportedContentTypeError(url, content_type)
+        declared = response.headers.get("content-length")
+        if max_bytes and declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ContentTooLargeError(url, max_bytes, int(declared))
+
+        parts: List[str] = []
+        head = b""
+        decoder = None
+        encoding = None
+        received = 0
+        # aiter_bytes() yields decompressed bytes, so the cap bounds memory
+        # even for small compressed bodies that inflate
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                raise ContentTooLargeError(url, max_bytes)
+            if decoder is None:
+                head += chunk
+                if len(head) < SNIFF_BYTES:
+                    continue
+                encoding = detect_encoding(content_type, head)
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                chunk, head = head, b""
+            parts.append(decoder.decode(chunk))
+
+        if decoder is None:
+            # Body shorter than the sniffing window
+            encoding = detect_encoding(content_type, head)
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            parts.append(decoder.decode(head))
+        parts.append(decoder.decode(b"", final=True))
+        return StaticResponse(response.status_code, response.headers, "".join(parts),
+                              encoding, received)
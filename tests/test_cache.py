@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+# cache.py imports ScrapeOptions from the scraper, which needs these
+for module in ("httpx", "selectolax", "playwright"):
+    pytest.importorskip(module)
+
+from cache import CacheDirectives, ResultCache, is_failed_result  # noqa: E402
+from scraper import ScrapeOptions  # noqa: E402
+
+URL = "https://example.com/page"
+
+
+def result(text="Some page text", errors=()):
+    return {
+        "url": URL,
+        "sections": [{"id": "main-0", "content": {"text": text, "links": []}}],
+        "errors": list(errors),
+    }
+
+
+def test_parse_directives():
+    assert CacheDirectives.parse(None) == CacheDirectives()
+    assert CacheDirectives.parse("no-cache") == CacheDirectives(no_cache=True)
+    assert CacheDirectives.parse("No-Store, max-age=60") == CacheDirectives(no_store=True, max_age=60.0)
+    assert CacheDirectives.parse("max-age=soon").max_age is None
+
+
+def test_hit_after_set():
+    cache = ResultCache()
+    options = ScrapeOptions()
+
+    async def scenario():
+        assert await cache.get(URL, options) is None
+        await cache.set(URL, options, result())
+        return await cache.get(URL + "#fragment", options)
+
+    assert asyncio.run(scenario()) == result()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_no_cache_refreshes_and_no_store_bypasses():
+    cache = ResultCache()
+    options = ScrapeOptions()
+
+    async def scenario():
+        await cache.set(URL, options, result("old"))
+        assert await cache.get(URL, options, CacheDirectives(no_cache=True)) is None
+        await cache.set(URL, options, result("new"), CacheDirectives(no_cache=True))
+        await cache.set(URL, options, result("ignored"), CacheDirectives(no_store=True))
+        assert await cache.get(URL, options, CacheDirectives(no_store=True)) is None
+        return await cache.get(URL, options)
+
+    assert asyncio.run(scenario()) == result("new")
+
+
+def test_max_age_rejects_older_entries():
+    cache = ResultCache()
+    options = ScrapeOptions()
+
+    async def scenario():
+        await cache.set(URL, options, result())
+        await asyncio.sleep(0.05)
+        assert await cache.get(URL, options, CacheDirectives(max_age=0.01)) is None
+        return await cache.get(URL, options, CacheDirectives(max_age=60))
+
+    assert asyncio.run(scenario()) == result()
+
+
+def test_failed_results():
+    assert is_failed_result(result(text=""))
+    assert is_failed_result({"sections": [], "errors": [{"message": "503", "phase": "fetch"}]})
+    assert is_failed_result(result(errors=[{"message": "JS scrape failed", "phase": "render"}]))
+    assert not is_failed_result(result(errors=[{"message": "Static scrape failed (blocked)", "phase": "fetch"}]))
+    assert not is_failed_result(result(errors=[{"message": "Section parsing failed", "phase": "parse"}]))
+
+
+def test_failed_results_use_error_ttl():
+    options = ScrapeOptions()
+    failed = result(text="", errors=[{"message": "HTTP 503", "phase": "fetch"}])
+
+    async def scenario(cache):
+        await cache.set(URL, options, failed)
+        return cache._entries
+
+    entries = asyncio.run(scenario(ResultCache(ttl=300, error_ttl=30)))
+    (_, stored_at, expires_at), = entries.values()
+    assert expires_at - stored_at == pytest.approx(30)
+    assert not asyncio.run(scenario(ResultCache(ttl=300, error_ttl=0)))
@@ -0,0 +1,141 @@
+import asyncio
+from urllib.parse import urljoin
+
+import pytest
+
+from crawler import BloomFilter, Crawler, Frontier
+from dedup import NearDuplicateTracker, format_fingerprint, simhash
+
+SEED = "https://example.com/"
+
+
+def site(pages):
+    """Stub fetch serving {url: (links, text)} as _scrape() results with absolute links."""
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        await asyncio.sleep(0)
+        if url not in pages:
+            raise RuntimeError(f"404 {url}")
+        links, text = pages[url]
+        section = {
+            "id": "main-0",
+            "content": {"text": text, "links": [{"href": urljoin(url, href), "text": ""} for href in links]},
+            "fingerprint": format_fingerprint(simhash(text)),
+        }
+        return {"url": url, "sections": [section]}, False
+
+    return fetch, fetched
+
+
+def run(crawler, seed=SEED):
+    async def collect():
+        return [event async for event in crawler.crawl(seed)]
+    return asyncio.run(collect())
+
+
+PAGES = {
+    SEED: (["/a", "/b", "https://other.com/x", "/file.pdf", "/a#top"], "home page text"),
+    "https://example.com/a": (["/a/deep", "/b"], "page a about apples"),
+    "https://example.com/b": (["/missing"], "page b about bananas"),
+    "https://example.com/a/deep": ([], "deep page about cherries"),
+}
+
+
+def test_crawl_follows_site_links_and_summarizes():
+    fetch, fetched = site(PAGES)
+    events = run(Crawler(fetch, max_depth=2, max_pages=10, concurrency=2))
+    pages = [event for event in events if event["type"] == "page"]
+    summary = events[-1]
+
+    assert summary["type"] == "summary"
+    assert {event["url"] for event in pages} == set(fetched)
+    assert sorted(fetched) == sorted(list(PAGES) + ["https://example.com/missing"])
+    assert fetched[0] == SEED
+    assert summary["crawled"] == 4
+    assert summary["failed"] == 1
+    assert summary["outOfScope"] == 2
+    assert summary["duplicates"] >= 2
+    assert [event for event in pages if "error" in event][0]["url"] == "https://example.com/missing"
+
+
+def test_crawl_respects_depth_and_page_limits():
+    fetch, fetched = site(PAGES)
+    run(Crawler(fetch, max_depth=1, max_pages=10))
+    assert "https://example.com/a/deep" not in fetched
+
+    fetch, fetched = site(PAGES)
+    events = run(Crawler(fetch, max_depth=3, max_pages=2))
+    assert len(fetched) == 2
+    assert events[-1]["crawled"] == 2
+
+
+def test_crawl_reports_near_duplicate_pages():
+    pages = {
+        SEED: (["/p1", "/p2"], "a long listing of many items for sale " * 5),
+        "https://example.com/p1": ([], "a long listing of many items for sale " * 5),
+        "https://example.com/p2": ([], "something completely different to read"),
+    }
+    fetch, _ = site(pages)
+    events = run(Crawler(fetch, near_duplicates=NearDuplicateTracker("skip"), concurrency=1))
+    by_url = {event["url"]: event for event in events if event["type"] == "page"}
+
+    assert by_url["https://example.com/p1"]["nearDuplicateOf"] == SEED
+    assert "result" not in by_url["https://example.com/p1"]
+    assert "result" in by_url["https://example.com/p2"]
+    assert events[-1]["duplicatePages"] == 1
+
+
+def test_crawl_follows_page_links_outside_sections():
+    fetch, fetched = site({
+        SEED: (["/a"], "home page text"),
+        "https://example.com/a": ([], "page a"),
+        "https://example.com/footer": ([], "linked only from the footer"),
+    })
+
+    async def fetch_with_links(url):
+        result, cached = await fetch(url)
+        if url == SEED:
+            # The full-document list from collect_links, beyond the sections
+            result["links"] = ["https://example.com/a", "https://example.com/footer"]
+        return result, cached
+
+    run(Crawler(fetch_with_links, max_depth=1))
+    assert "https://example.com/footer" in fetched
+
+
+def test_document_links_cover_the_whole_page():
+    for module in ("httpx", "selectolax", "playwright"):
+        pytest.importorskip(module)
+    from scraper import ParsedDocument, Scraper
+
+    anchors = "".join(f"<a href='/item/{n}'>item {n}</a>" for n in range(80))
+    html = (
+        "<html><head><base href='https://example.com/docs/'></head><body>"
+        "<nav><a href='intro'>Intro</a><a href='#top'>Top</a><a href='javascript:void(0)'>JS</a></nav>"
+        f"<main><h1>Items</h1>{anchors}<a href='intro#part'>again</a></main>"
+        "<div class='cookie-notice'><a href='/privacy'>Privacy</a></div><a href='mailto:a@b.c'>Mail</a>"
+        "</body></html>"
+    )
+    links = Scraper._document_links(ParsedDocument(html), "https://example.com/start")
+    assert links[0] == "https://example.com/docs/intro"
+    assert len(links) == 1 + 80 + 1
+    assert "https://example.com/item/79" in links
+    assert "https://example.com/privacy" in links
+    assert Scraper._document_links(ParsedDocument(""), "https://example.com/") is None
+
+
+def test_bloom_filter_and_frontier():
+    seen = BloomFilter(capacity=100)
+    assert seen.add("https://example.com/")
+    assert not seen.add("https://example.com/")
+    assert "https://example.com/" in seen
+
+    frontier = Frontier()
+    frontier.push("https://example.com/a/b?q=1", 1)
+    frontier.push("https://example.com/a", 1)
+    frontier.push("https://example.com/x/y/z", 0)
+    assert [frontier.pop()[0] for _ in range(3)] == [
+        "https://example.com/x/y/z", "https://example.com/a", "https://example.com/a/b?q=1",
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import warnings
+
+import pytest
+
+from deadline import Deadline, DeadlineExceeded
+
+
+def expired_deadline():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    return deadline
+
+
+def test_remaining_is_capped():
+    assert Deadline().remaining() is None
+    assert Deadline().remaining(5) == 5
+    assert Deadline(60).remaining(5) == 5
+    assert 0 < Deadline(1).remaining(5) <= 1
+
+
+def test_run_within_deadline():
+    async def value():
+        return 42
+
+    assert asyncio.run(Deadline(5).run(value(), "fetch")) == 42
+    assert asyncio.run(Deadline().run(value(), "fetch")) == 42
+
+
+def test_run_times_out_and_records_phase():
+    deadline = Deadline(0.05)
+
+    async def scenario():
+        await deadline.run(asyncio.sleep(1), "render")
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    assert deadline.exceeded_in == "render"
+
+
+def test_run_with_cap_raises_plain_timeout():
+    async def scenario():
+        await Deadline(5).run(asyncio.sleep(1), "render", cap=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+
+
+def test_expired_run_never_starts_coroutine():
+    started = []
+
+    async def work():
+        started.append(True)
+
+    deadline = expired_deadline()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(deadline.run(work(), "parse"))
+    assert not started
+    assert deadline.exceeded_in == "parse"
+
+
+def test_expired_run_cancels_tasks_and_gathers():
+    deadline = expired_deadline()
+
+    async def scenario():
+        tasks = [asyncio.create_task(asyncio.sleep(10)) for _ in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await deadline.run(asyncio.gather(*tasks), "parse")
+        single = asyncio.create_task(asyncio.sleep(10))
+        with pytest.raises(DeadlineExceeded):
+            await deadline.run(single, "parse")
+        return tasks + [single]
+
+    tasks = asyncio.run(scenario())
+    assert all(task.cancelled() for task in tasks)
@@ -0,0 +1,109 @@
+import random
+
+from dedup import (
+    NearDuplicateTracker, SimHashIndex, format_fingerprint, hamming, parse_fingerprint, simhash,
+)
+
+TEXT = (
+    "The quick brown fox jumps over the lazy dog while the farmer watches from the porch "
+    "and the cat sleeps in the warm afternoon sun beside the old red barn near the river"
+)
+
+
+def flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_simhash_is_stable_and_case_insensitive():
+    assert simhash(TEXT) == simhash(TEXT.upper()) == simhash("  " + TEXT.replace(" ", "\n"))
+    assert 0 <= simhash(TEXT) < 1 << 64
+    assert simhash("") is None
+    assert simhash("  ... !!") is None
+    assert simhash("two words") is not None
+
+
+def test_simhash_distance_tracks_similarity():
+    near = simhash(TEXT.replace("lazy", "sleepy"))
+    far = simhash("Quarterly revenue grew in every region except the north, where supply "
+                  "shortages delayed shipments of the new product line until late autumn")
+    assert hamming(simhash(TEXT), near) < hamming(simhash(TEXT), far)
+    assert hamming(simhash(TEXT), far) > 10
+
+
+def test_fingerprint_round_trip():
+    fingerprint = simhash(TEXT)
+    assert len(format_fingerprint(fingerprint)) == 16
+    assert parse_fingerprint(format_fingerprint(fingerprint)) == fingerprint
+    assert parse_fingerprint(None) is None
+
+
+def test_index_finds_every_fingerprint_within_distance():
+    rng = random.Random(7)
+    index = SimHashIndex(max_distance=3)
+    stored = rng.getrandbits(64)
+    index.add(stored, "original")
+    for distance in range(4):
+        for _ in range(20):
+            probe = flip(stored, *rng.sample(range(64), distance))
+            assert index.match(probe) == "original"
+    assert index.match(flip(stored, 0, 17, 33, 50)) is None
+
+
+def test_index_prefers_closest_and_check_stores_new_keys():
+    index = SimHashIndex(max_distance=3)
+    base = 0x0123456789ABCDEF
+    index.add(flip(base, 1, 2), "two away")
+    index.add(flip(base, 5), "one away")
+    assert index.match(base) == "one away"
+    assert index.check(flip(base, 5, 6), "new") == "one away"
+    far = ~base & (1 << 64) - 1
+    assert index.check(far, "far") is None
+    assert index.match(far) == "far"
+    assert len(index) == 3
+
+
+def test_index_evicts_oldest_entries():
+    index = SimHashIndex(max_distance=3, max_entries=2)
+    first, second, third = 0, (1 << 64) - 1, 0x00000000FFFFFFFF
+    for fingerprint, key in ((first, "first"), (second, "second"), (third, "third")):
+        index.add(fingerprint, key)
+    assert len(index) == 2
+    assert index.match(first) is None
+    assert index.match(third) == "third"
+
+
+def section(section_id, text):
+    return {"id": section_id, "content": {"text": text}, "fingerprint": format_fingerprint(simhash(text))}
+
+
+def test_tracker_flags_repeated_sections_and_pages():
+    chrome = "Home About Contact Careers Press Privacy policy Terms of service Cookie settings"
+    tracker = NearDuplicateTracker(mode="flag")
+    first = {"sections": [section("nav-0", chrome), section("main-1", TEXT)]}
+    second = {"sections": [section("nav-0", chrome), section("main-1", "An entirely different article about "
+                                                                      "mountain weather and hiking routes in spring")]}
+    result, duplicate_of = tracker.check("https://example.com/a", first)
+    assert (result, duplicate_of) == (first, None)
+
+    result, duplicate_of = tracker.check("https://example.com/b", second)
+    assert duplicate_of is None
+    assert result["sections"][0]["nearDuplicateOf"] == "https://example.com/a#nav-0"
+    assert "nearDuplicateOf" not in result["sections"][1]
+    # The input is never modified
+    assert "nearDuplicateOf" not in second["sections"][0]
+
+    _, duplicate_of = tracker.check("https://example.com/a?utm_source=x", first)
+    assert duplicate_of == "https://example.com/a"
+    assert tracker.stats() == {"duplicatePages": 1, "duplicateSections": 1}
+
+
+def test_tracker_skip_mode_drops_repeated_sections():
+    chrome = "Home About Contact Careers Press Privacy policy Terms of service Cookie settings"
+    tracker = NearDuplicateTracker(mode="skip")
+    tracker.check("https://example.com/a", {"sections": [section("nav-0", chrome), section("main-1", TEXT)]})
+    result, _ = tracker.check("https://example.com/b", {"sections": [
+        section("nav-0", chrome), section("main-1", "Completely unrelated notes on baking sourdough bread at home"),
+    ]})
+    assert [s["id"] for s in result["sections"]] == ["main-1"]
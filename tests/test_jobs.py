@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+# jobs.py imports ScrapeOptions from the scraper, which needs these
+for module in ("httpx", "selectolax", "playwright"):
+    pytest.importorskip(module)
+
+from jobs import JobQueue, QueueFullError  # noqa: E402
+from scraper import ScrapeOptions  # noqa: E402
+
+
+def runner(started=None, release=None):
+    """Stub runner; waits for release (if given) before returning a result."""
+    async def run(job):
+        if started is not None:
+            started.append(job.url)
+        if release is not None:
+            await release.wait()
+        if job.url.endswith("/fail"):
+            raise RuntimeError("boom")
+        return {"url": job.url, "sections": []}, False
+
+    return run
+
+
+async def wait_for_status(queue, job_id, *statuses):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"job {job_id} stuck in {job.status}")
+
+
+def test_jobs_run_to_success_or_failure():
+    async def scenario():
+        queue = JobQueue(runner(), workers=2)
+        await queue.start()
+        ok = await queue.submit("https://example.com/", ScrapeOptions())
+        bad = await queue.submit("https://example.com/fail", ScrapeOptions())
+        ok = await wait_for_status(queue, ok.id, "succeeded")
+        bad = await wait_for_status(queue, bad.id, "failed")
+        await queue.close()
+        return queue, ok, bad
+
+    queue, ok, bad = asyncio.run(scenario())
+    assert ok.result == {"url": "https://example.com/", "sections": []}
+    assert bad.error == "boom"
+    assert queue.stats()["succeeded"] == queue.stats()["failed"] == 1
+
+
+def test_cancel_queued_and_running_jobs():
+    async def scenario():
+        started = []
+        release = asyncio.Event()
+        queue = JobQueue(runner(started, release), workers=1)
+        await queue.start()
+        running = await queue.submit("https://example.com/running", ScrapeOptions())
+        queued = await queue.submit("https://example.com/queued", ScrapeOptions())
+        await wait_for_status(queue, running.id, "running")
+        await queue.cancel(queued.id)
+        await queue.cancel(running.id)
+        # The worker moves on, skipping the cancelled queued job
+        after = await queue.submit("https://example.com/after", ScrapeOptions())
+        release.set()
+        after = await wait_for_status(queue, after.id, "succeeded")
+        await queue.close()
+        return queue, started, await queue.get(running.id), await queue.get(queued.id)
+
+    queue, started, running, queued = asyncio.run(scenario())
+    assert started == ["https://example.com/running", "https://example.com/after"]
+    assert running.status == queued.status == "cancelled"
+    assert running.result is None
+    assert queue.stats()["cancelled"] == 2
+
+
+def test_submit_rejects_when_full():
+    async def scenario():
+        # Not started, so nothing drains the queue
+        queue = JobQueue(runner(), max_queue=1)
+        await queue.submit("https://example.com/a", ScrapeOptions())
+        with pytest.raises(QueueFullError):
+            await queue.submit("https://example.com/b", ScrapeOptions())
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_jobs_free_their_queue_slots():
+    async def scenario():
+        # Not started, so the cancelled ids stay in the underlying queue
+        queue = JobQueue(runner(), max_queue=2)
+        for job in [await queue.submit(f"https://example.com/{n}", ScrapeOptions()) for n in range(2)]:
+            await queue.cancel(job.id)
+        assert queue.stats()["queued"] == 0
+        kept = [await queue.submit(f"https://example.com/kept/{n}", ScrapeOptions()) for n in range(2)]
+        with pytest.raises(QueueFullError):
+            await queue.submit("https://example.com/rejected", ScrapeOptions())
+        # The worker skips the cancelled ids and runs the rest
+        await queue.start()
+        for job in kept:
+            await wait_for_status(queue, job.id, "succeeded")
+        stats = queue.stats()
+        await queue.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats["queued"], stats["succeeded"], stats["cancelled"]) == (0, 2, 2)
+
+
+def test_interrupted_jobs_run_again_after_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+
+    async def first_run():
+        started = []
+        queue = JobQueue(runner(started, asyncio.Event()), workers=1, db_path=db_path)
+        await queue.start()
+        running = await queue.submit("https://example.com/a", ScrapeOptions(mode="static"))
+        queued = await queue.submit("https://example.com/b", ScrapeOptions())
+        await wait_for_status(queue, running.id, "running")
+        await queue.close()
+        return running.id, queued.id
+
+    async def second_run(job_ids):
+        started = []
+        queue = JobQueue(runner(started), workers=1, db_path=db_path)
+        await queue.start()
+        jobs = [await wait_for_status(queue, job_id, "succeeded") for job_id in job_ids]
+        await queue.close()
+        return started, jobs
+
+    job_ids = asyncio.run(first_run())
+    started, jobs = asyncio.run(second_run(job_ids))
+    assert started == ["https://example.com/a", "https://example.com/b"]
+    assert jobs[0].scrape_options().mode == "static"
+
+    async def third_run():
+        # Finished jobs are read back from the store
+        queue = JobQueue(runner(), db_path=db_path)
+        job = await queue.get(job_ids[0])
+        await queue.close()
+        return job
+
+    assert asyncio.run(third_run()).status == "succeeded"
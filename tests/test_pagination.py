@@ -0,0 +1,81 @@
+from pagination import detect_pattern, find_next_url, plan_pagination
+
+
+class Element:
+    def __init__(self, href, text="", rel=None, label=None):
+        self.attributes = {"href": href, "rel": rel, "aria-label": label}
+        self._text = text
+
+    def text(self):
+        return self._text
+
+
+class Tree:
+    """Just enough of a selectolax tree for find_next_url()."""
+
+    def __init__(self, *elements):
+        self.elements = elements
+
+    def css(self, selector):
+        if "rel" in selector:
+            return [elem for elem in self.elements if "next" in (elem.attributes["rel"] or "").split()]
+        return list(self.elements)
+
+
+def test_find_next_url_prefers_rel_next():
+    tree = Tree(Element("/a?page=9", "Next"), Element("?page=2", rel="next"))
+    assert find_next_url(tree, "https://example.com/a") == "https://example.com/a?page=2"
+
+
+def test_find_next_url_reads_anchor_text_and_skips_scripts():
+    tree = Tree(Element("javascript:next()", "Next"), Element("#", "Next"),
+                Element("/list/page/2", label="Next page"), Element("/about", "Nextcloud"))
+    assert find_next_url(tree, "https://example.com/list") == "https://example.com/list/page/2"
+    assert find_next_url(Tree(Element("/about", "About")), "https://example.com/") is None
+
+
+def test_query_patterns():
+    pattern = detect_pattern("https://example.com/list?q=x", "https://example.com/list?q=x&page=2")
+    assert pattern.urls(2) == ["https://example.com/list?q=x&page=2", "https://example.com/list?q=x&page=3"]
+    pattern = detect_pattern("https://example.com/list?start=20", "https://example.com/list?start=40")
+    assert pattern.urls(2) == ["https://example.com/list?start=40", "https://example.com/list?start=60"]
+    pattern = detect_pattern("https://example.com/list", "https://example.com/list?offset=10")
+    assert (pattern.value, pattern.step) == (10, 10)
+
+
+def test_path_patterns():
+    pattern = detect_pattern("https://example.com/blog/page/2/", "https://example.com/blog/page/3/")
+    assert pattern.urls(2) == ["https://example.com/blog/page/3/", "https://example.com/blog/page/4/"]
+    pattern = detect_pattern("https://example.com/blog", "https://example.com/blog/page/2")
+    assert pattern.urls(2) == ["https://example.com/blog/page/2", "https://example.com/blog/page/3"]
+
+
+def test_non_counter_urls_are_not_predicted():
+    for current, following in [
+        # Numeric segments that are not named as page counters
+        ("https://example.com/products/123", "https://example.com/products/124"),
+        ("https://example.com/2023/05/post", "https://example.com/2023/06/post"),
+        # Unknown first-page parameter, non-numeric or decreasing counters
+        ("https://example.com/list", "https://example.com/list?id=2"),
+        ("https://example.com/list?page=a", "https://example.com/list?page=b"),
+        ("https://example.com/list?page=3", "https://example.com/list?page=2"),
+        # More than one difference, or another site
+        ("https://example.com/list?page=1&sort=a", "https://example.com/list?page=2&sort=b"),
+        ("https://example.com/page/1", "https://other.com/page/2"),
+    ]:
+        assert detect_pattern(current, following) is None, following
+
+
+def test_plan_pagination():
+    url = "https://example.com/list"
+    plan = plan_pagination(Tree(Element("?page=2", rel="next")), url, max_pages=3)
+    assert plan.predicted
+    assert plan.urls == ["https://example.com/list?page=2", "https://example.com/list?page=3"]
+
+    plan = plan_pagination(Tree(Element("/list/next-batch", "Next")), url, max_pages=3)
+    assert not plan.predicted
+    assert plan.urls == ["https://example.com/list/next-batch"]
+
+    assert plan_pagination(Tree(Element("?page=2", rel="next")), url, max_pages=1) is None
+    assert plan_pagination(Tree(Element(url, "Next")), url, max_pages=3) is None
+    assert plan_pagination(Tree(), url, max_pages=3) is None
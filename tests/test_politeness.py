@@ -0,0 +1,130 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from politeness import HostState, PolitenessScheduler, RobotsCache, parse_retry_after  # noqa: E402
+
+ROBOTS = "User-agent: *\nCrawl-delay: 2\nDisallow: /private\n"
+
+
+def test_parse_retry_after_seconds_and_dates():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 5 ") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(later) <= 60
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=60), usegmt=True)
+    assert parse_retry_after(earlier) == 0.0
+
+
+def test_token_bucket_allows_burst_then_paces():
+    state = HostState(rate=20.0, burst=3, max_concurrency=2)
+
+    async def take(count):
+        start = time.monotonic()
+        for _ in range(count):
+            await state.take_token()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(3)) < 0.03
+    # Two more tokens at 20/s take about 0.1s
+    assert 0.08 <= asyncio.run(take(2)) < 0.3
+
+
+def test_crawl_delay_removes_bursting():
+    state = HostState(rate=10.0, burst=5, max_concurrency=2)
+    state.apply_crawl_delay(0.5)
+    assert (state.rate, state.burst) == (2.0, 1)
+    assert state.tokens <= 1.0
+
+
+def test_retry_after_blocks_host_up_to_cap():
+    scheduler = PolitenessScheduler(max_retry_after=0.1)
+    scheduler.observe("https://example.com/a", 503, {"retry-after": "3600"})
+    state = scheduler._hosts["example.com"]
+    assert state.throttled == 1
+    assert state.blocked_until - time.monotonic() <= 0.1
+    scheduler.observe("https://other.com/a", 500, {"retry-after": "3600"})
+    assert "other.com" not in scheduler._hosts
+
+
+def robots_cache(body, status=200, **kwargs):
+    def handler(request):
+        assert request.url.path == "/robots.txt"
+        return httpx.Response(status, content=body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return RobotsCache(client, **kwargs)
+
+
+def test_robots_rules_and_crawl_delay():
+    cache = robots_cache(ROBOTS.encode())
+
+    async def scenario():
+        return await cache.get("https://example.com/page"), await cache.get("https://example.com/other")
+
+    robots, again = asyncio.run(scenario())
+    assert robots is again
+    assert cache.fetches == 1
+    assert cache.crawl_delay(robots) == 2.0
+    assert cache.allowed(robots, "https://example.com/page")
+    assert not cache.allowed(robots, "https://example.com/private/x")
+
+
+def test_missing_or_oversized_robots_allow_everything():
+    missing = robots_cache(b"", status=404)
+    assert asyncio.run(missing.get("https://example.com/")) is None
+
+    oversized = robots_cache(ROBOTS.encode() + b"#" * 2048, max_bytes=1024)
+    robots = asyncio.run(oversized.get("https://example.com/"))
+    assert robots is None
+    assert oversized.allowed(robots, "https://example.com/private/x")
+    assert oversized.stats()["oversized"] == 1
+
+
+def test_oversized_robots_without_content_length_is_cut_off():
+    async def body():
+        for _ in range(100):
+            yield b"#" * 512
+
+    def handler(request):
+        return httpx.Response(200, content=body())
+
+    cache = RobotsCache(httpx.AsyncClient(transport=httpx.MockTransport(handler)), max_bytes=1024)
+    assert asyncio.run(cache.get("https://example.com/")) is None
+    assert cache.oversized == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch():
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(200, content=ROBOTS.encode())
+
+    cache = RobotsCache(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    async def scenario():
+        first = asyncio.create_task(cache.get("https://example.com/a"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(cache.get("https://example.com/b"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        robots = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return robots
+
+    robots = asyncio.run(scenario())
+    assert cache.crawl_delay(robots) == 2.0
+    assert cache.fetches == 1
+    assert cache.stats()["cached"] == 1
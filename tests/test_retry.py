@@ -0,0 +1,98 @@
+import asyncio
+import random
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from retry import (  # noqa: E402
+    BLOCKED, CLIENT, CONTENT, FALLBACK_FAILURES, REFUSED, SERVER, TRANSIENT, RetriesExhaustedError, RetryPolicy,
+    classify_failure,
+)
+from static_fetch import ContentTooLargeError, UnsupportedContentTypeError  # noqa: E402
+
+URL = "https://example.com/"
+
+
+def status_error(status, headers=None):
+    request = httpx.Request("GET", URL)
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def failing(*errors):
+    """Stub fetch raising each error in turn, then returning "ok"."""
+    calls = []
+
+    async def fetch():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return fetch, calls
+
+
+def fast_policy(**kwargs):
+    return RetryPolicy(base_delay=0.001, max_delay=0.005, rng=random.Random(1), **kwargs)
+
+
+@pytest.mark.parametrize("error", [status_error(503), httpx.ConnectError("connection reset")])
+def test_transient_failures_are_retried_until_exhausted(error):
+    policy = fast_policy(max_attempts=3)
+    fetch, calls = failing(error, error, error, error)
+    with pytest.raises(RetriesExhaustedError) as raised:
+        asyncio.run(policy.call(fetch))
+    assert len(calls) == raised.value.attempts == 3
+    assert raised.value.last_error is error
+    assert classify_failure(raised.value) == TRANSIENT
+    assert TRANSIENT not in FALLBACK_FAILURES
+    assert (policy.calls, policy.retries, policy.exhausted) == (1, 2, 1)
+
+
+def test_transient_failure_then_success():
+    policy = fast_policy()
+    fetch, calls = failing(status_error(502), httpx.ReadTimeout("slow"))
+    assert asyncio.run(policy.call(fetch)) == "ok"
+    assert len(calls) == 3
+
+
+def test_permanent_failures_are_not_retried():
+    policy = fast_policy()
+    error = status_error(404)
+    fetch, calls = failing(error)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(policy.call(fetch))
+    assert len(calls) == 1
+    assert policy.retries == 0
+
+
+def test_retry_after_past_the_deadline_gives_up_at_once():
+    policy = fast_policy(deadline=1.0)
+    fetch, calls = failing(status_error(503, {"retry-after": "30"}))
+    with pytest.raises(RetriesExhaustedError):
+        asyncio.run(policy.call(fetch))
+    assert len(calls) == 1
+
+
+def test_classify_failure():
+    assert classify_failure(status_error(404)) == CLIENT
+    assert classify_failure(status_error(410)) == CLIENT
+    assert classify_failure(status_error(403)) == BLOCKED
+    assert classify_failure(status_error(501)) == SERVER
+    assert classify_failure(ContentTooLargeError(URL, 1024, 4096)) == REFUSED
+    assert classify_failure(UnsupportedContentTypeError(URL, "application/pdf")) == REFUSED
+    assert classify_failure(httpx.ConnectError("reset")) == TRANSIENT
+    assert classify_failure(UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid")) == CONTENT
+    # Only blocks and malformed content are worth a browser render
+    assert FALLBACK_FAILURES == {BLOCKED, CONTENT}
+
+
+def test_backoff_stays_under_the_ceiling():
+    policy = RetryPolicy(base_delay=0.25, max_delay=4.0, multiplier=2.0, rng=random.Random(3))
+    for attempt in range(1, 12):
+        ceiling = min(4.0, 0.25 * 2 ** (attempt - 1))
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # Full jitter spreads over the whole range
+        assert max(delays) > ceiling / 2
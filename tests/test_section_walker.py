@@ -0,0 +1,92 @@
+import pytest
+
+pytest.importorskip("selectolax")
+
+from selectolax.parser import HTMLParser  # noqa: E402
+
+from section_walker import walk_section  # noqa: E402
+
+# Heading levels, list types and cell types out of selector order, nesting,
+# empty headings and a root that matches a selector itself
+MIXED = """
+<main>
+  <h3>Third level</h3>
+  <h2>Second level</h2>
+  <h1></h1>
+  <h1>First level</h1>
+  <ol><li>one</li><li>two <ul><li>nested</li></ul></li></ol>
+  <ul><li>apple</li><li></li></ul>
+  <table>
+    <tr><th>Name</th><td>Value</td><th>Unit</th></tr>
+    <tr><td>size <table><tr><th>inner</th><td>cell</td></tr></table></td><th>mm</th></tr>
+    <tr></tr>
+  </table>
+  <h4>Fourth</h4><h2>Another second</h2>
+  <a href="/a">A <b>link</b></a><a href="">empty</a><img src="/i.png" alt="pic"><img src="">
+</main>
+"""
+
+
+def css_content(elem):
+    """What the per-field css() queries return for elem."""
+    label = next((h.text().strip() for h in elem.css("h1, h2, h3") if h.text().strip()), None)
+    lists = []
+    for ul_ol in elem.css("ul, ol"):
+        items = [li.text().strip() for li in ul_ol.css("li") if li.text().strip()]
+        if items:
+            lists.append(items)
+    tables = []
+    for table in elem.css("table"):
+        rows = []
+        for row in table.css("tr"):
+            cells = [cell.text().strip() for cell in row.css("td, th")]
+            if cells:
+                rows.append(cells)
+        if rows:
+            tables.append(rows)
+    return {
+        "label": label,
+        "headings": [h.text().strip() for h in elem.css("h1, h2, h3, h4, h5, h6") if h.text().strip()],
+        "text": elem.text(),
+        "links": [[a.attributes.get("href"), a.text().strip()] for a in elem.css("a") if a.attributes.get("href")],
+        "images": [(img.attributes.get("src"), img.attributes.get("alt", "")) for img in elem.css("img")
+                   if img.attributes.get("src")],
+        "lists": lists,
+        "tables": tables,
+    }
+
+
+def walker_content(elem):
+    content = walk_section(elem)
+    return {
+        "label": content.label_heading(),
+        "headings": content.heading_texts(),
+        "text": content.text,
+        "links": content.links,
+        "images": content.images,
+        "lists": content.list_items(),
+        "tables": content.table_rows(),
+    }
+
+
+def test_walker_matches_css_queries_on_mixed_order():
+    main = HTMLParser(MIXED).css_first("main")
+    expected = css_content(main)
+    assert walker_content(main) == expected
+    # The baseline ordering: h1 before h2, ul before ol, td before th
+    assert expected["label"] == "First level"
+    assert expected["headings"][:3] == ["First level", "Second level", "Another second"]
+    assert expected["lists"][0] == ["nested"]
+    assert expected["tables"][0][0] == ["Value", "Name", "Unit"]
+
+
+def test_walker_matches_css_queries_for_every_subtree():
+    tree = HTMLParser(MIXED)
+    for elem in tree.css("main, table, tr, ol, ul, li"):
+        assert walker_content(elem) == css_content(elem), elem.tag
+
+
+def test_root_heading_labels_itself():
+    heading = HTMLParser("<h2>Title <small>sub</small></h2>").css_first("h2")
+    assert walker_content(heading) == css_content(heading)
+    assert walk_section(heading).label_heading() == "Title sub"
@@ -0,0 +1,126 @@
+"""
+Condition-based settling for Playwright pages.
+
+Each wait returns as soon as its condition holds and never runs longer than
+its ceiling. A fixed sleep is only used when a condition cannot be observed
+(for example the page navigated away mid-evaluation).
+"""
+import asyncio
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+_DOM_QUIET_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let capTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (settled) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(settled);
+    };
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    capTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+_SCROLL_SETTLED_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    const start = performance.now();
+    let lastHeight = document.body ? document.body.scrollHeight : 0;
+    let lastChange = start;
+    const poll = () => {
+        const now = performance.now();
+        const height = document.body ? document.body.scrollHeight : 0;
+        if (height !== lastHeight) {
+            lastHeight = height;
+            lastChange = now;
+        }
+        if (now - lastChange >= quietMs) return resolve(true);
+        if (now - start >= timeoutMs) return resolve(false);
+        setTimeout(poll, 50);
+    };
+    poll();
+})
+"""
+
+
+class WaitEngine:
+    """Waits on DOM mutations, in-flight requests, selectors and scroll height."""
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.inflight = 0
+        self._last_network_change = asyncio.get_running_loop().time()
+        page.on("request", self._on_request_started)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def _on_request_started(self, _request):
+        self.inflight += 1
+        self._last_network_change = asyncio.get_running_loop().time()
+
+    def _on_request_done(self, _request):
+        self.inflight = max(0, self.inflight - 1)
+        self._last_network_change = asyncio.get_running_loop().time()
+
+    async def dom_quiet(self, quiet_ms: int = 300, timeout: float = 2.0) -> bool:
+        """Wait until no DOM mutation has happened for quiet_ms."""
+        return await self.page.evaluate(_DOM_QUIET_JS, [quiet_ms, int(timeout * 1000)])
+
+    async def network_quiet(self, max_inflight: int = 0, quiet_ms: int = 300,
+                            timeout: float = 2.0) -> bool:
+        """Wait until at most max_inflight requests have been pending for quiet_ms."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        quiet = quiet_ms / 1000
+        while True:
+            now = loop.time()
+            if self.inflight <= max_inflight and now - self._last_network_change >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(self.POLL_INTERVAL, deadline - now))
+
+    async def selector(self, selector: str, timeout: float = 2.0) -> bool:
+        """Wait until selector is attached to the DOM."""
+        try:
+            await self.page.wait_for_selector(selector, state="attached", timeout=timeout * 1000)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def scroll_settled(self, quiet_ms: int = 300, timeout: float = 1.5) -> bool:
+        """Wait until document.body.scrollHeight has stopped growing."""
+        return await self.page.evaluate(_SCROLL_SETTLED_JS, [quiet_ms, int(timeout * 1000)])
+
+    async def settle(self, ceiling: float, quiet_ms: int = 300, scroll: bool = False) -> bool:
+        """
+        Wait for the page to go quiet (DOM, network and optionally scroll
+        height), sharing one ceiling across the conditions.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ceiling
+        try:
+            settled = await self.dom_quiet(quiet_ms, ceiling)
+            if scroll:
+                settled = await self.scroll_settled(quiet_ms, max(0.0, deadline - loop.time())) and settled
+            settled = await self.network_quiet(
+                quiet_ms=quiet_ms, timeout=max(0.0, deadline - loop.time())
+            ) and settled
+            return settled
+        except PlaywrightTimeoutError:
+            return False
+        except Exception:
+            # Condition could not be observed (e.g. navigation); last resort is a fixed sleep
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            return False